@@ -1,4 +1,4 @@
-from dash import Dash, html, Output, Input, State
+from dash import Dash, html, Output, Input, State, no_update
 from dash_extensions import Lottie
 
 app = Dash(__name__)
@@ -16,7 +16,6 @@ app.layout = html.Div([
                         Lottie(
                             id="lottie-left",
                             options={"loop": True, "autoplay": False},
-                            url="/assets/MXcxdY0Q8P.json"
                         )
                     ])
                 ]),
@@ -25,7 +24,6 @@ app.layout = html.Div([
                         Lottie(
                             id="lottie-right",
                             options={"loop": True, "autoplay": False},
-                            url="/assets/ani2.json"
                         )
                     ])
                 ])
@@ -43,6 +41,8 @@ app.layout = html.Div([
     Output("lottie-container-right", "className"),
     Output("lottie-left", "options"),
     Output("lottie-right", "options"),
+    Output("lottie-left", "url"),
+    Output("lottie-right", "url"),
     Input("translate-btn", "n_clicks"),
     State("lottie-left", "options"),
     State("lottie-right", "options"),
@@ -51,8 +51,10 @@ def show_popup(n, left_opts, right_opts):
     if n > 0:
         left_opts["autoplay"] = True
         right_opts["autoplay"] = True
-        return "popup popup-show", "lottie-container-active", "lottie-container-active", left_opts, right_opts
-    return "popup hidden", "hidden", "hidden", left_opts, right_opts
+        # Animations are fetched on first open rather than with the page
+        return ("popup popup-show", "lottie-container-active", "lottie-container-active", left_opts, right_opts,
+                app.get_asset_url("MXcxdY0Q8P.json"), app.get_asset_url("ani2.json"))
+    return "popup hidden", "hidden", "hidden", left_opts, right_opts, no_update, no_update
 
 
 
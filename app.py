@@ -1,17 +1,33 @@
 import dash
-from dash import dcc, html, Input, Output, State, callback,ctx
+from dash import dcc, html, Input, Output, State, callback, ClientsideFunction
 import dash_bootstrap_components as dbc
-import base64
 import io
-import os
-from dash_extensions import Lottie
+from dash_extensions import Lottie, EventSource
 from line_processor_component import get_line_processor_layout, register_line_processor_callbacks
 from translationHelper import register_callbacks
-import tempfile
-from moviepy import VideoFileClip
+from translation_cache import translation_cache
+from upload_routes import register_upload_routes, resolve_upload
+from video_probe import probe_video
+from job_manager import job_manager, DONE, FAILED
+from job_routes import register_job_routes
+from media_routes import register_media_routes
+from health_routes import register_health_routes
+from static_assets import register_static_assets, asset_url
+from http_caching import register_http_caching
+from lazy_imports import preload_heavy_modules
+from video_pipeline import run_video_job
 # Initialize the Dash app
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 app.title = "Subhashit - an AiTransmute solution"
+translation_cache.init_app(app.server)
+register_upload_routes(app.server)
+register_job_routes(app.server)
+register_media_routes(app.server)
+register_health_routes(app.server)
+register_static_assets(app)
+register_http_caching(app)
+# Media libraries load on first use unless PRELOAD_HEAVY_MODULES=1 (fork-shared under serve.py)
+preload_heavy_modules()
 
 # Indian languages for the dropdown
 INDIAN_LANGUAGES = [
@@ -42,11 +58,7 @@ SOURCE_LANGUAGES = [
 
 # Define the layout
 app.layout = html.Div([
-    # Custom CSS
-    html.Link(
-        rel='stylesheet',
-        href='/assets/app_style.css'
-    ),
+    # assets/app_style.css is auto-included by Dash (versioned, see static_assets.py)
 
     # Main container
     html.Div([
@@ -81,7 +93,8 @@ app.layout = html.Div([
                 dcc.Dropdown(
                     id='target-language',
                     options=INDIAN_LANGUAGES,
-                    value='df',
+                    value=['df'],
+                    multi=True,
                     className='language-dropdown',
                     clearable=False
                 ),
@@ -114,6 +127,9 @@ app.layout = html.Div([
                     dbc.Button("Close", id="close-modal", className="ms-auto", n_clicks=0)
                 ),
             ], id="result-modal-txt", is_open=False),
+            # Background translation job being polled by the modal
+            dcc.Store(id="txt-job-id"),
+            dcc.Interval(id="txt-job-interval", interval=500, n_intervals=0, disabled=True),
 
             # Media input section
             html.Div([
@@ -158,15 +174,16 @@ app.layout = html.Div([
                 html.Div([
                     html.H3("Video Translation", className='section-title'),
                     html.Div([
-                        dcc.Upload(
+                        # Handled by assets/chunked-upload.js, which streams the file to /uploads
+                        html.Div(
                             id='video-upload',
                             children=html.Div([
                                 html.I(className='video-icon'),
                                 html.Span('Upload Video')
                             ]),
                             className='media-button upload',
-                            multiple=False
                         ),
+                        dcc.Store(id='video-upload-id'),
                     ], className='media-controls'),
 
                     html.Div(id='video-status', className='status-display'),
@@ -189,18 +206,29 @@ app.layout = html.Div([
         ], className='loading-container'),
         html.Div(id="popup", className="popup hidden", children=[
             html.Button("✖", id="close-btn", className="close-btn"),
+            # Job progress is pushed over server-sent events; start_video_job mounts the
+            # EventSource here once there is a job URL. The interval is only enabled as a
+            # polling fallback if the event stream cannot be used
+            html.Div(id="video-job-events-container"),
             dcc.Interval(
                 id="progress-interval",
                 interval=1000,        # 1 second
                 n_intervals=0,
-                max_intervals=70,
                 disabled=True         # Start as disabled
             ),
+            # Video job being tracked, and its latest status/progress snapshot
+            dcc.Store(id="video-job-id"),
+            dcc.Store(id="video-job-state"),
+            # Animations are fetched only when the popup first opens (ui.togglePopup)
+            dcc.Store(id="lottie-urls", data={
+                "left": asset_url(app, "Scanning.json"),
+                "right": asset_url(app, "video.json"),
+            }),
             
             html.Div(className="popup-content", children=[
                 html.Div(id="status-bar-container", className="status-bar", children=[
                     html.Div(id="status-bar-fill", className="status-fill"),
-                    html.Div("Processing video translation...", className="status-text")
+                    html.Div("Processing video translation...", id="status-text", className="status-text")
                 ]),
                 get_line_processor_layout(),
                 html.Div(className="animation-row", children=[
@@ -211,7 +239,6 @@ app.layout = html.Div([
                             Lottie(
                                 id="lottie-left",
                                 options={"loop": True, "autoplay": False},
-                                url="/assets/Scanning.json"
                             )
                         ])
                     ]),
@@ -222,7 +249,6 @@ app.layout = html.Div([
                             Lottie(
                                 id="lottie-right",
                                 options={"loop": True, "autoplay": False},
-                                url="/assets/video.json"
                             )
                         ])
                     ])
@@ -231,7 +257,7 @@ app.layout = html.Div([
                 # Cancel button below the animation row
                 html.Div(className="cancel-btn-container", children=[
                     html.Button("Cancel Process", id="cancel-btn", className="cancel-btn"),
-                    html.A("Download Video", id="download-btn", className="download-btn hidden", href="/assets/translated_video.mp4", download="translated_video.mp4"),
+                    html.A("Download Video", id="download-btn", className="download-btn hidden", href="#"),
                     # Invisible button to detect click
                     html.Button(id="download-btn-helper", n_clicks=0, style={"display": "none"})
                 ])
@@ -247,86 +273,117 @@ app.layout = html.Div([
     html.Div(id='text-file-data', style={'display': 'none'}),
 ], className='app-wrapper')
 
+# video-job-events only exists while a job is tracked; declare it for callback validation
+app.validation_layout = html.Div([app.layout, EventSource(id="video-job-events", url="/jobs/")])
+
 # Callbacks
 
 register_callbacks(app)
 register_line_processor_callbacks(app)
-@app.callback(
+# Pure UI callbacks run in the browser (assets/ui-callbacks.js)
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="showTranslateButton"),
     Output("translate-container", "className"),
-    Input("video-upload", "contents"),
+    Input("video-upload-id", "data"),
     prevent_initial_call=True
 )
-def show_translate_button(uploaded_file):
-    if uploaded_file:
-        return ""  # Show the div (no class)
-    return "hidden"
 
 @app.callback(
-    Output("cancel-btn", "className"),
-    Output("download-btn", "className"),
+    Output("video-job-state", "data"),
+    Output("progress-interval", "disabled", allow_duplicate=True),
     Input("progress-interval", "n_intervals"),
+    State("video-job-id", "data"),
     prevent_initial_call=True
 )
-def toggle_buttons(n_intervals):
-    if n_intervals >= 70:
-        return "hidden", "download-btn"
-    return "cancel-btn", "hidden"
-
-
-@app.callback(
-    Output("status-bar-fill", "style"),
-    Input("progress-interval", "n_intervals"),
+def poll_video_job(n_intervals, job_id):
+    # Fallback path only: normally the same snapshots arrive via video-job-events
+    state = job_manager.snapshot(job_id)
+    if state is None:
+        return dash.no_update, True
+    return state, state["status"] in (DONE, FAILED)
+
+
+app.clientside_callback(
+    ClientsideFunction(namespace="jobEvents", function_name="onMessage"),
+    Output("video-job-state", "data", allow_duplicate=True),
+    Output("video-job-events", "close"),
+    Input("video-job-events", "message"),
     prevent_initial_call=True
 )
-def update_progress_bar(n_intervals):
-    progress_percent = min(100, int((n_intervals / 70) * 100))
-    return {"width": f"{progress_percent}%", "backgroundColor": "#00ffff"}
 
+app.clientside_callback(
+    ClientsideFunction(namespace="jobEvents", function_name="fallback"),
+    Output("progress-interval", "disabled", allow_duplicate=True),
+    Output("video-job-events-container", "children", allow_duplicate=True),
+    Input("video-job-events", "error"),
+    State("video-job-state", "data"),
+    prevent_initial_call=True
+)
 
 
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="toggleButtons"),
+    Output("cancel-btn", "className"),
+    Output("download-btn", "className"),
+    Output("download-btn", "href"),
+    Input("video-job-state", "data"),
+    State("video-job-id", "data"),
+    prevent_initial_call=True
+)
 
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="updateProgressBar"),
+    Output("status-bar-fill", "style"),
+    Output("status-text", "children"),
+    Input("video-job-state", "data"),
+    prevent_initial_call=True
+)
 
-@app.callback(
+# Popup visibility and Lottie autoplay toggling
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="togglePopup"),
     Output("popup", "className"),
     Output("lottie-container-left", "className"),
     Output("lottie-container-right", "className"),
     Output("lottie-left", "options"),
     Output("lottie-right", "options"),
     Output("progress-interval", "disabled"),
+    Output("video-job-events-container", "children"),
+    Output("lottie-left", "url"),
+    Output("lottie-right", "url"),
     Input("translate-btn", "n_clicks"),
     Input("cancel-btn", "n_clicks"),
     Input("download-btn-helper", "n_clicks"),
     Input("close-btn", "n_clicks"),  # 👈 new close button
     State("lottie-left", "options"),
     State("lottie-right", "options"),
+    State("video-upload-id", "data"),
+    State("lottie-urls", "data"),
+    State("lottie-left", "url"),
     prevent_initial_call=True
 )
-def handle_all_actions(n_translate, n_cancel, n_download, n_close, left_opts, right_opts):
-    trigger = ctx.triggered_id
-
-    if trigger == "translate-btn":
-        left_opts["autoplay"] = True
-        right_opts["autoplay"] = True
-        return (
-            "popup popup-show",
-            "lottie-container-active",
-            "lottie-container-active",
-            left_opts,
-            right_opts,
-            False
-        )
-
-    elif trigger in ["cancel-btn", "download-btn-helper", "close-btn"]:
-        return (
-            "popup hidden",
-            "hidden",
-            "hidden",
-            left_opts,
-            right_opts,
-            True
-        )
-
-    return "popup hidden", "hidden", "hidden", left_opts, right_opts, True
+
+
+@app.callback(
+    Output("video-job-id", "data"),
+    Output("video-job-state", "data", allow_duplicate=True),
+    Output("video-job-events-container", "children", allow_duplicate=True),
+    Input("translate-btn", "n_clicks"),
+    State("video-upload-id", "data"),
+    State("target-language", "value"),
+    prevent_initial_call=True
+)
+def start_video_job(n_translate, upload, langs):
+    if not upload:
+        return dash.no_update, dash.no_update, dash.no_update
+    try:
+        job_id = job_manager.submit("video-translation", run_video_job, upload["upload_id"], langs)
+    except RuntimeError as e:
+        # Worker is draining for a restart: show it as a failed job the user can retry
+        state = {"status": FAILED, "progress": 0, "stage": None, "error": str(e), "outputs": []}
+        return None, state, None
+    # A fresh EventSource per job; unmounting it (popup closed) closes the stream
+    return job_id, None, EventSource(id="video-job-events", url=f"/jobs/{job_id}/events")
 
 
 
@@ -381,36 +438,39 @@ def handle_all_actions(n_translate, n_cancel, n_download, n_close, left_opts, ri
 
 @app.callback(
     Output('video-status', 'children'),
-    Input('video-upload', 'contents'),
-    State('video-upload', 'filename'),
+    Input('video-upload-id', 'data'),
     prevent_initial_call=True
 )
-def handle_video_upload(contents, filename):
-    if contents is None:
+def handle_video_upload(upload):
+    if not upload:
         return ""
 
-    content_type, content_string = contents.split(',')
-    decoded = base64.b64decode(content_string)
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=filename) as tmp:
-        tmp.write(decoded)
-        temp_path = tmp.name
+    filename = upload.get('filename')
+    meta = resolve_upload(upload.get('upload_id'))
+    if meta is None:
+        return html.Div([
+            html.I(className='error-icon'),
+            html.Span(f"⚠️ Upload of '{filename}' was not completed")
+        ], className='error-message')
 
     try:
-        clip = VideoFileClip(temp_path)
-        duration = clip.duration  # in seconds
-        clip.close()
+        # Reads only the container header, memoised by the upload's content hash
+        info = probe_video(meta['path'], content_hash=meta.get('sha256'))
 
-        file_size = os.path.getsize(temp_path)  # in bytes
-        file_size_mb = round(file_size / (1024 * 1024), 2)
+        file_size_mb = round(meta['size'] / (1024 * 1024), 2)
+        audio = f"{info.audio_codec}, {info.audio_sample_rate} Hz" if info.has_audio else "none"
 
         return html.Div([
             html.I(className='success-icon'),
             html.Span(f"Video file '{filename}' uploaded successfully!"),
             html.Br(),
-            html.Span(f"📏 Duration: {round(duration, 2)} seconds"),
+            html.Span(f"📏 Duration: {round(info.duration, 2)} seconds"),
+            html.Br(),
+            html.Span(f"🎞️ Video: {info.width}x{info.height} @ {round(info.fps, 2)} fps ({info.video_codec})"),
             html.Br(),
-            html.Span(f"📦 Size: {file_size_mb} MB")
+            html.Span(f"🔊 Audio: {audio}"),
+            html.Br(),
+            html.Span(f"📦 Size: {file_size_mb} MB ({info.bitrate_kbps} kb/s)")
         ], className='success-message')
 
     except Exception as e:
@@ -418,20 +478,16 @@ def handle_video_upload(contents, filename):
             html.I(className='error-icon'),
             html.Span(f"⚠️ Error processing video: {str(e)}")
         ], className='error-message')
-    finally:
-        os.remove(temp_path)
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="swapLanguages"),
     [Output('source-language', 'value'), Output('target-language', 'value')],
     Input('swap-languages', 'n_clicks'),
     [State('source-language', 'value'), State('target-language', 'value')],
     prevent_initial_call=True
 )
-def swap_languages(n_clicks, source, target):
-    if n_clicks:
-        return target, source
-    return source, target
 
 if __name__ == '__main__':
+    # Development server; use `python serve.py` in production
     app.run(debug=True, host='0.0.0.0', port=8050)
 
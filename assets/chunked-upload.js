@@ -0,0 +1,126 @@
+// Resumable chunked video upload.
+// Streams the selected file to /uploads in fixed-size chunks and only hands the
+// resulting upload id to Dash (via the "video-upload-id" store), so the video
+// never travels through a callback payload.
+(function () {
+    const MAX_ATTEMPTS = 5;
+
+    function setProps(id, props) {
+        if (window.dash_clientside && window.dash_clientside.set_props) {
+            window.dash_clientside.set_props(id, props);
+        }
+    }
+
+    function showStatus(text) {
+        setProps("video-status", { children: text });
+    }
+
+    function resumeKey(file) {
+        return "upload:" + file.name + ":" + file.size + ":" + file.lastModified;
+    }
+
+    async function requestJSON(url, options) {
+        const response = await fetch(url, options);
+        const body = await response.json().catch(() => ({}));
+        return { response, body };
+    }
+
+    async function startOrResume(file) {
+        const key = resumeKey(file);
+        const previous = localStorage.getItem(key);
+        if (previous) {
+            const { response, body } = await requestJSON("/uploads/" + previous);
+            if (response.ok) {
+                return { uploadId: previous, offset: body.offset, chunkSize: 8 * 1024 * 1024 };
+            }
+            localStorage.removeItem(key);
+        }
+
+        const { response, body } = await requestJSON("/uploads", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ filename: file.name, size: file.size }),
+        });
+        if (!response.ok) {
+            throw new Error(body.error || "Upload rejected (" + response.status + ")");
+        }
+        localStorage.setItem(key, body.upload_id);
+        return { uploadId: body.upload_id, offset: 0, chunkSize: body.chunk_size };
+    }
+
+    async function sendChunk(uploadId, file, offset, chunkSize) {
+        const chunk = file.slice(offset, Math.min(offset + chunkSize, file.size));
+        for (let attempt = 0; ; attempt++) {
+            try {
+                const { response, body } = await requestJSON(
+                    "/uploads/" + uploadId + "?offset=" + offset,
+                    { method: "PUT", body: chunk }
+                );
+                if (response.ok || response.status === 409) {
+                    // 409 carries the server's offset; continue from there
+                    return body.offset;
+                }
+                if (response.status < 500) {
+                    throw new Error(body.error || "Upload failed (" + response.status + ")");
+                }
+            } catch (err) {
+                if (!(err instanceof TypeError) || attempt + 1 >= MAX_ATTEMPTS) {
+                    throw err;
+                }
+            }
+            if (attempt + 1 >= MAX_ATTEMPTS) {
+                throw new Error("Upload failed after " + MAX_ATTEMPTS + " attempts");
+            }
+            await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** attempt * (0.5 + Math.random())));
+        }
+    }
+
+    async function upload(file) {
+        try {
+            let { uploadId, offset, chunkSize } = await startOrResume(file);
+            while (offset < file.size) {
+                showStatus("Uploading '" + file.name + "'... " + Math.floor((offset / file.size) * 100) + "%");
+                offset = await sendChunk(uploadId, file, offset, chunkSize);
+            }
+            showStatus("Processing '" + file.name + "'...");
+            const { response, body } = await requestJSON("/uploads/" + uploadId + "/complete", { method: "POST" });
+            if (!response.ok) {
+                throw new Error(body.error || "Upload could not be completed");
+            }
+            localStorage.removeItem(resumeKey(file));
+            setProps("video-upload-id", { data: { upload_id: uploadId, filename: file.name } });
+        } catch (err) {
+            showStatus("⚠️ " + err.message);
+        }
+    }
+
+    function pickFile() {
+        const input = document.createElement("input");
+        input.type = "file";
+        input.accept = "video/*";
+        input.addEventListener("change", () => {
+            if (input.files.length) {
+                upload(input.files[0]);
+            }
+        });
+        input.click();
+    }
+
+    // The upload area is rendered by Dash after load, so listen on the document
+    document.addEventListener("click", (event) => {
+        if (event.target.closest("#video-upload")) {
+            pickFile();
+        }
+    });
+    document.addEventListener("dragover", (event) => {
+        if (event.target.closest("#video-upload")) {
+            event.preventDefault();
+        }
+    });
+    document.addEventListener("drop", (event) => {
+        if (event.target.closest("#video-upload") && event.dataTransfer.files.length) {
+            event.preventDefault();
+            upload(event.dataTransfer.files[0]);
+        }
+    });
+})();
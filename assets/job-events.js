@@ -0,0 +1,25 @@
+// Clientside handlers for the video job's server-sent event stream.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    jobEvents: {
+        // Each SSE message is a job snapshot; store it and stop listening once the job has ended
+        onMessage: function (message) {
+            if (!message) {
+                return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+            }
+            const state = JSON.parse(message);
+            const finished = state.status === "done" || state.status === "failed";
+            return [state, finished];
+        },
+        // If the stream errors before the job ends (e.g. 503 when the worker has no free
+        // stream slot), drop the EventSource and fall back to interval polling. The
+        // component is unmounted when the popup closes, so this cannot fire after that.
+        fallback: function (error, state) {
+            const noUpdate = window.dash_clientside.no_update;
+            const finished = state && (state.status === "done" || state.status === "failed");
+            if (!error || finished) {
+                return [noUpdate, noUpdate];
+            }
+            return [false, null];
+        }
+    }
+});
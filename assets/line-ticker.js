@@ -0,0 +1,96 @@
+// Clientside rendering of the pipeline stage ticker (line_processor_component).
+// The stage list is shipped once in the "line-stages" store; the current index
+// follows the running job stage, and the visible window is rebuilt here.
+(function () {
+    const MAX_VISIBLE = 5;
+
+    const LINE_STYLE = {
+        padding: "10px",
+        borderRadius: "8px",
+        marginBottom: "6px",
+        boxShadow: "0 1px 3px rgba(0,0,0,0.1)",
+        display: "flex",
+        alignItems: "center",
+        minHeight: "40px",
+        transition: "all 0.3s ease-in-out"
+    };
+
+    function component(type, props) {
+        return { type: type, namespace: "dash_html_components", props: props };
+    }
+
+    function line(text, icon, color, className, bold) {
+        return component("Div", {
+            className: className,
+            style: Object.assign({ color: color }, LINE_STYLE),
+            children: [
+                icon,
+                component("Span", { children: text, style: { fontWeight: bold ? "bold" : "normal" } })
+            ]
+        });
+    }
+
+    function iconSpan(icon) {
+        return component("Span", { children: icon, style: { marginRight: "8px" } });
+    }
+
+    // Same markup as dbc.Spinner(size="sm", color="primary", type="border")
+    function spinner() {
+        return component("Span", {
+            className: "spinner-border spinner-border-sm text-primary",
+            role: "status",
+            style: { marginRight: "8px" }
+        });
+    }
+
+    // Same cleanup line_processor_component applies to the stage lines
+    function normalize(name) {
+        return name.replace(/[,;]/g, " ").split(/\s+/).filter(Boolean).join(" ");
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        lineTicker: {
+            // Index of the stage the job is running; past the end once it is done.
+            // Never moves back within a job (a new job starts from a null state)
+            follow: function (state, lines, current) {
+                if (!state) {
+                    return 0;
+                }
+                if (state.status === "done") {
+                    return lines.length;
+                }
+                const index = state.stage ? lines.indexOf(normalize(state.stage)) : -1;
+                return index > (current || 0) ? index : window.dash_clientside.no_update;
+            },
+
+            render: function (step, lines) {
+                const total = lines.length;
+                let start;
+                if (step <= 2) {
+                    start = 0;
+                } else if (step >= total - 2) {
+                    start = Math.max(0, total - MAX_VISIBLE);
+                } else {
+                    start = step - 2;
+                }
+                const end = Math.min(start + MAX_VISIBLE, total);
+
+                const display = [];
+                for (let idx = start; idx < end; idx++) {
+                    if (idx < step) {
+                        display.push(line(lines[idx], iconSpan("✅"), "green", "line-completed", false));
+                    } else if (idx === step) {
+                        display.push(line(lines[idx], spinner(), "#0d47a1", "line-processing", true));
+                    } else {
+                        display.push(line(lines[idx], iconSpan("⏳"), "gray", "line-pending", false));
+                    }
+                }
+                // Keep the panel height stable near the end of the list
+                while (display.length < MAX_VISIBLE) {
+                    display.push(line("", iconSpan(""), "gray", "output-area", false));
+                }
+                return display;
+            }
+        }
+    });
+})();
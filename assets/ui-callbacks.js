@@ -0,0 +1,72 @@
+// Clientside versions of app.py callbacks that only shuffle component props.
+(function () {
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        ui: {
+            // Target is a multi-select: swap the source with the first target language
+            swapLanguages: function (nClicks, source, target) {
+                const targets = Array.isArray(target) ? target : [target];
+                if (nClicks && targets.length) {
+                    return [targets[0], [source]];
+                }
+                return [source, target];
+            },
+
+            showTranslateButton: function (upload) {
+                return upload ? "" : "hidden";
+            },
+
+            // The download link is per job: /media/jobs/<id>/video, once the job published it
+            toggleButtons: function (state, jobId) {
+                if (state && state.status === "done") {
+                    if ((state.outputs || []).includes("video")) {
+                        return ["hidden", "download-btn", "/media/jobs/" + jobId + "/video?download=1"];
+                    }
+                    return ["hidden", "hidden", "#"];
+                }
+                return ["cancel-btn", "hidden", "#"];
+            },
+
+            updateProgressBar: function (state) {
+                state = state || {};
+                const percent = Math.min(100, Math.floor((state.progress || 0) * 100));
+                let text;
+                if (state.status === "failed") {
+                    text = "Video translation failed: " + state.error;
+                } else if (state.status === "done") {
+                    text = "Video translation complete";
+                } else {
+                    text = state.stage || "Processing video translation...";
+                }
+                return [{ width: percent + "%", backgroundColor: "#00ffff" }, text];
+            },
+
+            // Opens the popup and starts the Lottie animations on Translate; any of
+            // cancel/download/close hides it again and stops listening for progress.
+            // The animation JSON is only requested the first time the popup opens;
+            // its versioned URL is then served from the browser cache.
+            togglePopup: function (nTranslate, nCancel, nDownload, nClose, leftOpts, rightOpts, upload, lottieUrls, leftUrl) {
+                const triggered = window.dash_clientside.callback_context.triggered;
+                const trigger = triggered.length ? triggered[0].prop_id.split(".")[0] : null;
+                const noUpdate = window.dash_clientside.no_update;
+
+                if (trigger === "translate-btn" && upload) {
+                    const urls = leftUrl ? [noUpdate, noUpdate] : [lottieUrls.left, lottieUrls.right];
+                    return [
+                        "popup popup-show",
+                        "lottie-container-active",
+                        "lottie-container-active",
+                        Object.assign({}, leftOpts, { autoplay: true }),
+                        Object.assign({}, rightOpts, { autoplay: true }),
+                        true,
+                        noUpdate
+                    ].concat(urls);
+                }
+                if (["cancel-btn", "download-btn-helper", "close-btn"].includes(trigger)) {
+                    // Unmount the job's EventSource, which closes the stream
+                    return ["popup hidden", "hidden", "hidden", leftOpts, rightOpts, true, null, noUpdate, noUpdate];
+                }
+                return ["popup hidden", "hidden", "hidden", leftOpts, rightOpts, true, noUpdate, noUpdate, noUpdate];
+            }
+        }
+    });
+})();
@@ -0,0 +1,208 @@
+import math
+import os
+import subprocess
+import tempfile
+from dataclasses import dataclass, asdict
+
+from lazy_imports import lazy_module
+from media_store import media_store, artifact_name
+from video_probe import ffmpeg_exe
+
+np = lazy_module("numpy")
+
+# Canonical format for every audio stage: mono float32 at this rate
+AUDIO_SAMPLE_RATE = int(os.environ.get("AUDIO_SAMPLE_RATE", "16000"))
+# Samples per block read from ffmpeg or processed at once; bounds memory regardless of video length
+AUDIO_BLOCK_SECONDS = int(os.environ.get("AUDIO_BLOCK_SECONDS", "30"))
+# Loudness target (dBFS of gated RMS, EBU R128-style gating without K-weighting) and peak ceiling
+AUDIO_TARGET_DBFS = float(os.environ.get("AUDIO_TARGET_DBFS", "-23"))
+AUDIO_PEAK_DBFS = float(os.environ.get("AUDIO_PEAK_DBFS", "-1"))
+
+PCM_DTYPE = "float32"
+_GATE_BLOCK_SECONDS = 0.4
+_ABSOLUTE_GATE_DB = -70.0
+_RELATIVE_GATE_DB = -10.0
+
+
+@dataclass
+class PcmAudio:
+    """
+    Mono float32 PCM stored as a raw derived artifact of a source video.
+
+    `samples()` maps the file read-only instead of loading it, so stages can
+    slice hours of audio without copying it into memory.
+    """
+    source: str
+    name: str
+    sample_rate: int
+    num_samples: int
+    # Gated loudness of the audio in dBFS, when measured
+    loudness_db: float = None
+
+    @property
+    def path(self):
+        return media_store.derived_path(self.source, self.name)
+
+    @property
+    def duration(self):
+        return self.num_samples / self.sample_rate if self.sample_rate else 0.0
+
+    def samples(self):
+        if self.num_samples == 0:
+            return np.zeros(0, dtype=PCM_DTYPE)
+        return np.memmap(self.path, dtype=PCM_DTYPE, mode="r", shape=(self.num_samples,))
+
+    def blocks(self, block_samples=None):
+        """Yield (start, view) over the samples in bounded blocks."""
+        block_samples = block_samples or AUDIO_BLOCK_SECONDS * self.sample_rate
+        data = self.samples()
+        for start in range(0, self.num_samples, block_samples):
+            yield start, data[start:start + block_samples]
+
+    def fingerprint(self):
+        # Artifacts are content-addressed by source hash and name
+        return f"{self.source}/{self.name}"
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+def _read_full(stream, view):
+    """Fill `view` from `stream`; returns bytes read (short only at EOF)."""
+    filled = 0
+    while filled < len(view):
+        n = stream.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+
+def _stream_pcm(path, sample_rate, out, progress=None, expected_samples=0):
+    """
+    Decode the first audio stream of `path` to mono s16le at `sample_rate`
+    through an ffmpeg pipe, converting each bounded block to float32 and
+    appending it to the binary file `out`. Returns the number of samples.
+    """
+    command = [
+        ffmpeg_exe(), "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", path, "-map", "0:a:0", "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-acodec", "pcm_s16le", "-f", "s16le", "pipe:1",
+    ]
+    block_samples = AUDIO_BLOCK_SECONDS * sample_rate
+    block = bytearray(block_samples * 2)
+    view = memoryview(block)
+    # Reused for every block, so memory stays at two fixed buffers
+    scaled = np.empty(block_samples, dtype=PCM_DTYPE)
+    total = 0
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            while True:
+                n = _read_full(process.stdout, view) // 2 * 2
+                if n == 0:
+                    break
+                count = n // 2
+                pcm = np.frombuffer(block, dtype="<i2", count=count)
+                np.multiply(pcm, np.float32(1.0 / 32768.0), out=scaled[:count])
+                out.write(scaled[:count].data)
+                total += count
+                if progress and expected_samples:
+                    progress(min(total / expected_samples, 1.0))
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode("utf-8", errors="replace").strip().splitlines()
+            raise ValueError(f"Audio extraction failed: {message[-1] if message else returncode}")
+    return total
+
+
+def extract_audio(path, source, duration=0.0, sample_rate=AUDIO_SAMPLE_RATE, progress=None):
+    """
+    Extract the audio of video `path` (stored under content hash `source`)
+    as canonical mono float32 PCM. The result is kept in the media store, so
+    later jobs for the same video skip decoding.
+    """
+    name = artifact_name("audio", sample_rate, suffix=".f32")
+    samples = {}
+
+    def produce(tmp):
+        with open(tmp, "wb") as out:
+            samples["n"] = _stream_pcm(path, sample_rate, out, progress, int(duration * sample_rate))
+
+    path_out = media_store.get_or_create_derived(source, name, produce)
+    num_samples = samples.get("n", os.path.getsize(path_out) // np.dtype(PCM_DTYPE).itemsize)
+    return PcmAudio(source, name, sample_rate, num_samples)
+
+
+def gated_loudness(audio):
+    """
+    Integrated loudness (dBFS) and absolute peak of `audio`, in one
+    streaming pass: mean square per 400 ms block, blocks under -70 dBFS
+    dropped, then blocks more than 10 dB under the remaining mean dropped.
+    Returns (None, peak) for silence.
+    """
+    gate = int(_GATE_BLOCK_SECONDS * audio.sample_rate)
+    block_samples = max(gate, (AUDIO_BLOCK_SECONDS * audio.sample_rate) // gate * gate)
+    powers, peak = [], 0.0
+    for _, data in audio.blocks(block_samples):
+        if len(data) == 0:
+            continue
+        peak = max(peak, float(np.max(np.abs(data))))
+        whole = len(data) // gate * gate
+        if whole:
+            powers.append(np.mean(np.square(data[:whole], dtype="float64").reshape(-1, gate), axis=1))
+        if whole < len(data):
+            powers.append(np.array([np.mean(np.square(data[whole:], dtype="float64"))]))
+    if not powers:
+        return None, peak
+
+    powers = np.concatenate(powers)
+    powers = powers[powers > 10 ** (_ABSOLUTE_GATE_DB / 10)]
+    if powers.size == 0:
+        return None, peak
+    powers = powers[powers > np.mean(powers) * 10 ** (_RELATIVE_GATE_DB / 10)]
+    return float(10 * np.log10(np.mean(powers))), peak
+
+
+def normalize_audio(audio, target_db=AUDIO_TARGET_DBFS, peak_db=AUDIO_PEAK_DBFS, progress=None):
+    """
+    Scale `audio` to `target_db` gated loudness, never pushing a peak above
+    `peak_db`, block by block from one memory map into another.
+    """
+    name = artifact_name("audio", audio.sample_rate, "norm", int(target_db), suffix=".f32")
+    # The gain is kept next to the output, so a cached result skips the measuring pass too
+    meta_name = name + ".json"
+    meta = media_store.get_json(audio.source, meta_name)
+    if meta is not None and media_store.get_derived(audio.source, name):
+        return PcmAudio(audio.source, name, audio.sample_rate, audio.num_samples, meta["loudness_db"])
+
+    loudness, peak = gated_loudness(audio)
+    gain = 1.0
+    if loudness is not None:
+        gain = 10 ** ((target_db - loudness) / 20)
+    if peak > 0:
+        gain = min(gain, 10 ** (peak_db / 20) / peak)
+
+    def produce(tmp):
+        if audio.num_samples == 0:
+            open(tmp, "wb").close()
+            return
+        out = np.memmap(tmp, dtype=PCM_DTYPE, mode="w+", shape=(audio.num_samples,))
+        for start, data in audio.blocks():
+            np.multiply(data, gain, out=out[start:start + len(data)])
+            if progress:
+                progress((start + len(data)) / audio.num_samples)
+        out.flush()
+        del out
+
+    media_store.get_or_create_derived(audio.source, name, produce)
+    loudness_db = None if loudness is None else round(loudness + 20 * math.log10(gain), 2)
+    media_store.put_json(audio.source, meta_name, {"loudness_db": loudness_db, "gain": gain})
+    return PcmAudio(audio.source, name, audio.sample_rate, audio.num_samples, loudness_db)
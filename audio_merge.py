@@ -0,0 +1,145 @@
+import os
+import struct
+import subprocess
+import wave
+
+from lazy_imports import lazy_module
+from video_probe import ffmpeg_exe
+
+np = lazy_module("numpy")
+
+# Output rate when it cannot be taken from the first part (typical TTS rate)
+MERGE_SAMPLE_RATE = int(os.environ.get("MERGE_SAMPLE_RATE", "24000"))
+# Short fade-in/out on both ends of every part, so clips do not start or stop with a click
+MERGE_FADE_MS = int(os.environ.get("MERGE_FADE_MS", "10"))
+# Silence between consecutive parts
+MERGE_GAP_SECONDS = float(os.environ.get("MERGE_GAP_SECONDS", "0.15"))
+
+_WAV_HEADER_BYTES = 44
+
+
+def resample(samples, source_rate, target_rate):
+    """Linear-interpolation resampling; enough for speech between TTS rates."""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    count = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(count, dtype="float64") * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype("float32")
+
+
+def wav_sample_rate(path):
+    """Sample rate of a PCM WAV file, or None if it is not one."""
+    try:
+        with wave.open(path, "rb") as f:
+            return f.getframerate()
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def wav_length(path, sample_rate):
+    """
+    Number of samples `read_audio(path, sample_rate)` returns, from the
+    header of a PCM WAV file alone; None if it is not one.
+    """
+    try:
+        with wave.open(path, "rb") as f:
+            frames, rate = f.getnframes(), f.getframerate()
+    except (wave.Error, EOFError, OSError):
+        return None
+    return frames if rate == sample_rate or frames == 0 else int(round(frames * sample_rate / rate))
+
+
+def read_audio(path, sample_rate):
+    """
+    Decode an audio file to mono float32 at `sample_rate`. PCM WAV is read
+    directly; anything else (mp3, float WAV, ...) is decoded by ffmpeg.
+    """
+    try:
+        with wave.open(path, "rb") as f:
+            width, channels, rate = f.getsampwidth(), f.getnchannels(), f.getframerate()
+            raw = f.readframes(f.getnframes())
+    except (wave.Error, EOFError):
+        command = [
+            ffmpeg_exe(), "-nostdin", "-hide_banner", "-loglevel", "error", "-i", path,
+            "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "f32le", "pipe:1",
+        ]
+        completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+        if completed.returncode != 0:
+            raise ValueError(f"Could not decode {os.path.basename(path)}: "
+                             f"{completed.stderr.decode('utf-8', errors='replace').strip()}")
+        return np.frombuffer(completed.stdout, dtype="<f4").copy()
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype="u1").astype("float32") - 128) / 128
+    elif width in (2, 4):
+        kind = "<i2" if width == 2 else "<i4"
+        samples = np.frombuffer(raw, dtype=kind).astype("float32") / float(2 ** (8 * width - 1))
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width * 8} bits")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return resample(samples, rate, sample_rate)
+
+
+def create_float_wav(path, num_samples, sample_rate):
+    """
+    Preallocate a mono 32-bit IEEE-float WAV of `num_samples` silent
+    samples and return a writable memory map over its data chunk.
+    """
+    data_bytes = num_samples * 4
+    header = b"".join([
+        b"RIFF", struct.pack("<I", 36 + data_bytes), b"WAVE",
+        # fmt chunk: format 3 (IEEE float), mono, rate, byte rate, block align, bits
+        b"fmt ", struct.pack("<IHHIIHH", 16, 3, 1, sample_rate, sample_rate * 4, 4, 32),
+        b"data", struct.pack("<I", data_bytes),
+    ])
+    with open(path, "wb") as f:
+        f.write(header)
+        f.truncate(_WAV_HEADER_BYTES + data_bytes)
+    if num_samples == 0:
+        return np.zeros(0, dtype="float32")
+    return np.memmap(path, dtype="<f4", mode="r+", offset=_WAV_HEADER_BYTES, shape=(num_samples,))
+
+
+def _write_part(out, start, samples, fade):
+    """Write `samples` at `start` with faded ends, truncated to the buffer."""
+    if start >= len(out) or len(samples) == 0:
+        return
+    samples = samples[:len(out) - start]
+    n = min(fade, len(samples) // 2)
+    if n:
+        ramp = np.linspace(0.0, 1.0, n + 2, dtype="float32")[1:-1]
+        samples[:n] *= ramp
+        samples[-n:] *= ramp[::-1]
+    out[start:start + len(samples)] = samples
+
+
+def merge_sequential(paths, out_path, gap_seconds=MERGE_GAP_SECONDS, fade_ms=MERGE_FADE_MS):
+    """
+    Join audio files one after another with `gap_seconds` of silence in
+    between (e.g. the per-chunk TTS of a long text) into one float WAV.
+    Uses the first file's rate when it is a PCM WAV.
+
+    Lengths come from the WAV headers, so the output is allocated first and
+    each part is then decoded and written in place one at a time; memory
+    use is one part. Parts in other formats are decoded once more just to
+    measure them.
+    """
+    sample_rate = wav_sample_rate(paths[0]) or MERGE_SAMPLE_RATE
+    lengths = []
+    for path in paths:
+        length = wav_length(path, sample_rate)
+        lengths.append(len(read_audio(path, sample_rate)) if length is None else length)
+    gap = int(round(gap_seconds * sample_rate))
+    total = sum(lengths) + gap * max(len(paths) - 1, 0)
+
+    out = create_float_wav(out_path, total, sample_rate)
+    fade = fade_ms * sample_rate // 1000
+    position = 0
+    for path, length in zip(paths, lengths):
+        _write_part(out, position, read_audio(path, sample_rate)[:length], fade)
+        position += length + gap
+    if isinstance(out, np.memmap):
+        out.flush()
+    del out
+    return out_path
@@ -0,0 +1,142 @@
+"""
+Count the server round trips of a scripted user session, before and after
+the UI callbacks in CONVERTED were moved to the browser.
+
+Callback runs are replayed against app._callback_list, following cascades
+(an output that is itself an input of another callback is counted again).
+"Before" is the same graph with the CONVERTED callbacks on the server, as
+they were, and with start_video_job folded back into the popup callback
+it was split from. Clientside callbacks that never ran on the server
+(job events, the stage ticker) are listed but not counted as savings.
+
+Usage:
+    python benchmarks/callback_requests.py [--job-updates N] [--text-polls N]
+"""
+import argparse
+import os
+import sys
+from collections import Counter, deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+
+
+# Clientside functions that replaced server callbacks: swap_languages,
+# show_translate_button, toggle_buttons, update_progress_bar and the popup part
+# of handle_all_actions
+CONVERTED = {
+    ("ui", "swapLanguages"),
+    ("ui", "showTranslateButton"),
+    ("ui", "toggleButtons"),
+    ("ui", "updateProgressBar"),
+    ("ui", "togglePopup"),
+}
+# Server callbacks split out of a converted one; before, they ran in the same request
+SPLIT_FROM_CONVERTED = {"start_video_job"}
+
+
+def session_events(job_updates, text_polls):
+    """(component id, property, times) for a typical translate-text + translate-video session."""
+    return [
+        ("swap-languages", "n_clicks", 2),
+        ("txt-translation", "n_clicks", 1),
+        ("txt-job-interval", "n_intervals", text_polls),
+        ("close-modal", "n_clicks", 1),
+        ("video-upload-id", "data", 1),
+        ("translate-btn", "n_clicks", 1),
+        ("video-job-events", "message", job_updates),
+        ("close-btn", "n_clicks", 1),
+    ]
+
+
+def _props(spec):
+    return [(item["id"], item["property"]) for item in spec]
+
+
+def _outputs(callback):
+    outputs = []
+    for output in callback["output"].strip(".").split("..."):
+        component_id, _, prop = output.partition(".")
+        outputs.append((component_id, prop.split("@")[0]))
+    return outputs
+
+
+def _function(callback):
+    spec = callback.get("clientside_function")
+    return (spec["namespace"], spec["function_name"]) if spec else None
+
+
+def _name(callback):
+    function = _function(callback)
+    if function:
+        return ".".join(function)
+    # _callback_list holds the specs; the Python function is in callback_map
+    fn = app.callback_map.get(callback["output"], {}).get("callback")
+    return getattr(fn, "__name__", None) or callback["output"]
+
+
+def count(callbacks, events, max_depth=4):
+    """{callback name: runs} for the session, and the set of clientside names."""
+    by_input = {}
+    for callback in callbacks:
+        for prop in _props(callback["inputs"]):
+            by_input.setdefault(prop, []).append(callback)
+
+    runs, clientside = Counter(), set()
+    for component_id, prop, times in events:
+        queue = deque([((component_id, prop), 0)])
+        fired = set()
+        while queue:
+            trigger, depth = queue.popleft()
+            for callback in by_input.get(trigger, []):
+                key = callback["output"]
+                if key in fired or depth > max_depth:
+                    continue
+                fired.add(key)
+                name = _name(callback)
+                runs[name] += times
+                if _function(callback):
+                    clientside.add(name)
+                queue.extend((output, depth + 1) for output in _outputs(callback))
+    return runs, clientside
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--job-updates", type=int, default=20,
+                        help="progress snapshots pushed during one video job")
+    parser.add_argument("--text-polls", type=int, default=6,
+                        help="txt-job-interval ticks while a text translation runs")
+    args = parser.parse_args()
+
+    runs, clientside = count(app._callback_list, session_events(args.job_updates, args.text_polls))
+    converted = {".".join(function) for function in CONVERTED}
+
+    width = max(len(name) for name in runs) + 2
+    print(f"{'callback':<{width}}{'runs':>6}  {'before':<11}now")
+    before = after = 0
+    for name, n in runs.most_common():
+        if name in converted:
+            was, now = "server", "clientside"
+            before += n
+        elif name in SPLIT_FROM_CONVERTED:
+            was, now = "(in popup)", "server"
+            after += n
+        elif name in clientside:
+            was = now = "clientside"
+        else:
+            was = now = "server"
+            before += n
+            after += n
+        print(f"{name:<{width}}{n:>6}  {was:<11}{now}")
+
+    print()
+    print(f"server requests per session, before: {before}")
+    print(f"server requests per session, now:    {after}")
+    if before:
+        print(f"saved by the converted callbacks:    {before - after} ({(before - after) / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
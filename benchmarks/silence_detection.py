@@ -0,0 +1,86 @@
+"""
+Check pause detection on synthetic speech-like tracks, clean and noisy.
+
+Builds tracks of 3 s tones separated by 1 s gaps, with silent gaps and
+with broadband hiss throughout, and checks that every gap is found as a
+pause in each. Also times detection on an hour of the noisy track. Exits
+non-zero if a gap is missed, so it can run in CI next to startup_profile.
+
+Usage:
+    python benchmarks/silence_detection.py [--hiss-dbfs -50] [--minutes 60]
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from silence_detect import detect_pauses  # noqa: E402
+
+SAMPLE_RATE = 16000
+TONE_SECONDS = 3
+GAP_SECONDS = 1
+
+
+@dataclass
+class MemoryAudio:
+    """The part of PcmAudio that detect_pauses uses, over an in-memory array."""
+    data: np.ndarray
+    sample_rate: int = SAMPLE_RATE
+
+    @property
+    def num_samples(self):
+        return len(self.data)
+
+    def samples(self):
+        return self.data
+
+
+def track(cycles, hiss_dbfs=None, seed=0):
+    """`cycles` x (gap, tone) followed by a final gap, optionally with hiss."""
+    t = np.arange(TONE_SECONDS * SAMPLE_RATE) / SAMPLE_RATE
+    tone = (0.3 * np.sin(2 * np.pi * 220 * t)).astype("float32")
+    gap = np.zeros(GAP_SECONDS * SAMPLE_RATE, dtype="float32")
+    data = np.concatenate([np.concatenate([gap, tone]) for _ in range(cycles)] + [gap])
+    if hiss_dbfs is not None:
+        rng = np.random.default_rng(seed)
+        data += (10 ** (hiss_dbfs / 20) * rng.standard_normal(len(data))).astype("float32")
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hiss-dbfs", type=float, default=-50)
+    parser.add_argument("--minutes", type=float, default=60)
+    args = parser.parse_args()
+
+    failures = []
+    cycles = 4
+    for label, hiss in (("clean", None), (f"hiss {args.hiss_dbfs:g} dBFS", args.hiss_dbfs)):
+        pauses = detect_pauses(MemoryAudio(track(cycles, hiss))).pauses
+        print(f"{label:24} {len(pauses):>4} pauses (expected {cycles + 1})")
+        if len(pauses) != cycles + 1:
+            failures.append(f"{label}: found {len(pauses)} pauses, expected {cycles + 1}")
+
+    cycles = int(args.minutes * 60 // (TONE_SECONDS + GAP_SECONDS))
+    audio = MemoryAudio(track(cycles, args.hiss_dbfs))
+    started = time.perf_counter()
+    pause_map = detect_pauses(audio)
+    seconds = time.perf_counter() - started
+    longest = max(end - start for start, end in pause_map.chunks()) / SAMPLE_RATE
+    print(f"{args.minutes:g} min with hiss: {len(pause_map.pauses)} pauses in {seconds:.2f} s, "
+          f"longest chunk {longest:.1f} s")
+    if len(pause_map.pauses) != cycles + 1:
+        failures.append(f"{args.minutes:g} min: found {len(pause_map.pauses)} pauses, expected {cycles + 1}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Report what importing the app costs, from `python -X importtime`.
+
+Imports `app` (or --module) in a fresh interpreter, groups the import
+times by top-level package and prints the most expensive ones. Exits
+non-zero if the total exceeds --budget-ms or if any --forbid package
+(by default the deferred media stack) was imported at startup, so it can
+run in CI as a startup regression check.
+
+Usage:
+    python benchmarks/startup_profile.py [--module app] [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from lazy_imports import HEAVY_MODULES  # noqa: E402
+
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", "1500"))
+# Media packages that must only be imported when a video is processed. PIL is not
+# listed: dash imports plotly, which imports PIL._version at startup on its own
+FORBIDDEN = HEAVY_MODULES + ("moviepy", "imageio", "proglog")
+
+# "import time:       412 |       1830 |   dash.development"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def profile(module):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr[-2000:])
+        raise SystemExit(f"Importing {module!r} failed")
+    return parse_importtime(completed.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--forbid", default=",".join(FORBIDDEN),
+                        help="comma separated packages that must not be imported")
+    args = parser.parse_args()
+
+    rows = profile(args.module)
+    by_package = defaultdict(int)
+    for module, self_us, _ in rows:
+        by_package[module.split(".")[0]] += self_us
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000.0
+
+    print(f"{'package':32} {'self ms':>10}")
+    for package, self_us in sorted(by_package.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{package:32} {self_us / 1000.0:>10.1f}")
+    print(f"{'total':32} {total_ms:>10.1f}  (budget {args.budget_ms:.0f} ms, {len(rows)} modules)")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"startup imports took {total_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    forbidden = [p for p in filter(None, args.forbid.split(",")) if p in by_package]
+    if forbidden:
+        failures.append(f"imported at startup: {', '.join(sorted(forbidden))}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Build optimized variants of everything in assets/ for static_assets.py.
+
+For each asset a content-fingerprinted copy is written to build/assets/,
+plus:
+  - text assets (CSS, JS, JSON, SVG, HTML): precompressed .gz and, if the
+    `brotli` package is installed, .br copies; Lottie animations are
+    minified first (see minify_lottie)
+  - raster images: a copy resized to at most ASSET_IMAGE_MAX_WIDTH pixels
+    wide and a WebP variant (needs Pillow)
+and manifest.json maps each asset name to its files.
+
+Usage:
+    python build_assets.py [--assets-dir assets] [--out build/assets]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+try:
+    import brotli
+except ImportError:  # gzip-only build
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:  # images are copied unchanged
+    Image = None
+
+from static_assets import ASSET_BUILD_DIR, MANIFEST_NAME
+
+ASSET_IMAGE_MAX_WIDTH = int(os.environ.get("ASSET_IMAGE_MAX_WIDTH", "1024"))
+WEBP_QUALITY = int(os.environ.get("ASSET_WEBP_QUALITY", "80"))
+# Decimal places kept for Lottie keyframe values; 3 is visually lossless at popup sizes
+LOTTIE_PRECISION = int(os.environ.get("LOTTIE_PRECISION", "3"))
+
+TEXT_SUFFIXES = {".css", ".js", ".json", ".svg", ".html", ".txt"}
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+# Not worth compressing: below this size, or when it saves less than 10%
+MIN_COMPRESS_BYTES = 512
+MIN_SAVING = 0.9
+
+
+def _fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _write(out_dir, name, data):
+    with open(os.path.join(out_dir, name), "wb") as f:
+        f.write(data)
+    return name
+
+
+def _is_lottie(doc):
+    return isinstance(doc, dict) and {"v", "layers", "fr", "ip", "op"} <= doc.keys()
+
+
+def _round_floats(value, precision):
+    if isinstance(value, float):
+        rounded = round(value, precision)
+        return int(rounded) if rounded.is_integer() else rounded
+    if isinstance(value, list):
+        return [_round_floats(v, precision) for v in value]
+    if isinstance(value, dict):
+        return {k: _round_floats(v, precision) for k, v in value.items()}
+    return value
+
+
+def _drop_hidden(items):
+    """Remove hidden (hd) layers/shapes, recursing into shape groups."""
+    kept = []
+    for item in items:
+        if isinstance(item, dict):
+            if item.get("hd") is True:
+                continue
+            for key in ("shapes", "it"):
+                if isinstance(item.get(key), list):
+                    item[key] = _drop_hidden(item[key])
+        kept.append(item)
+    return kept
+
+
+def minify_lottie(doc, precision=LOTTIE_PRECISION):
+    """
+    Shrink a Lottie document without changing how it renders: trim float
+    precision, drop hidden layers and shapes, assets no layer references,
+    and the editor-only `meta` block.
+    """
+    doc = _round_floats(doc, precision)
+    doc.pop("meta", None)
+    doc["layers"] = _drop_hidden(doc["layers"])
+
+    assets = {a.get("id"): a for a in doc.get("assets", []) if isinstance(a, dict)}
+    for asset in assets.values():
+        if isinstance(asset.get("layers"), list):
+            asset["layers"] = _drop_hidden(asset["layers"])
+
+    # Precomps can reference further assets, so walk references from the root layers
+    used, pending = set(), list(doc["layers"])
+    while pending:
+        ref = pending.pop().get("refId")
+        if ref in assets and ref not in used:
+            used.add(ref)
+            pending.extend(assets[ref].get("layers", []))
+    if "assets" in doc:
+        doc["assets"] = [a for a in doc["assets"] if not isinstance(a, dict) or a.get("id") in used]
+    return doc
+
+
+def build_text(name, data, out_dir, digest):
+    stem, suffix = os.path.splitext(name)
+    if suffix == ".json":
+        try:
+            doc = json.loads(data)
+        except ValueError:
+            doc = None
+        if _is_lottie(doc):
+            data = json.dumps(minify_lottie(doc), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    base = _write(out_dir, f"{stem}.{digest}{suffix}", data)
+    variants = {}
+    if len(data) < MIN_COMPRESS_BYTES:
+        return base, variants
+
+    compressed = {"gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed["br"] = brotli.compress(data, quality=11)
+    for key, blob in compressed.items():
+        if len(blob) < len(data) * MIN_SAVING:
+            variants[key] = _write(out_dir, f"{base}.{key}", blob)
+    return base, variants
+
+
+def build_image(name, path, out_dir, digest):
+    stem, suffix = os.path.splitext(name)
+    base = f"{stem}.{digest}{suffix}"
+    if Image is None:
+        shutil.copyfile(path, os.path.join(out_dir, base))
+        return base, {}
+
+    with Image.open(path) as image:
+        if image.width > ASSET_IMAGE_MAX_WIDTH:
+            height = round(image.height * ASSET_IMAGE_MAX_WIDTH / image.width)
+            image = image.resize((ASSET_IMAGE_MAX_WIDTH, height), Image.LANCZOS)
+        image.save(os.path.join(out_dir, base), optimize=True)
+        webp = f"{stem}.{digest}.webp"
+        image.save(os.path.join(out_dir, webp), "WEBP", quality=WEBP_QUALITY, method=6)
+    return base, {"webp": webp}
+
+
+def build_assets(assets_dir, out_dir):
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    manifest = {}
+    for root, _, files in os.walk(assets_dir):
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, assets_dir).replace(os.sep, "/")
+            suffix = os.path.splitext(name)[1].lower()
+            target_dir = os.path.join(out_dir, os.path.dirname(name))
+            os.makedirs(target_dir, exist_ok=True)
+
+            with open(path, "rb") as f:
+                data = f.read()
+            digest = _fingerprint(data)
+            if suffix in IMAGE_SUFFIXES:
+                base, variants = build_image(os.path.basename(name), path, target_dir, digest)
+            elif suffix in TEXT_SUFFIXES:
+                base, variants = build_text(os.path.basename(name), data, target_dir, digest)
+            else:
+                base, variants = _write(target_dir, f"{digest}-{os.path.basename(name)}", data), {}
+
+            prefix = os.path.dirname(name)
+            manifest[name] = {
+                "file": f"{prefix}/{base}" if prefix else base,
+                "hash": digest,
+                "mimetype": mimetypes.guess_type(name)[0] or "application/octet-stream",
+                "variants": {k: f"{prefix}/{v}" if prefix else v for k, v in variants.items()},
+                "size": len(data),
+                # Checked at serve time, so a source edited after the build is not served stale
+                "mtime_ns": os.stat(path).st_mtime_ns,
+            }
+
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest
+
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--assets-dir", default=os.path.join(here, "assets"))
+    parser.add_argument("--out", default=ASSET_BUILD_DIR)
+    args = parser.parse_args()
+
+    manifest = build_assets(args.assets_dir, args.out)
+    before = after = 0
+    for name, entry in sorted(manifest.items()):
+        smallest = min(
+            os.path.getsize(os.path.join(args.out, f))
+            for f in [entry["file"], *entry["variants"].values()]
+        )
+        before += entry["size"]
+        after += smallest
+        print(f"{name:32} {entry['size']:>10,} -> {smallest:>10,}")
+    print(f"{'total':32} {before:>10,} -> {after:>10,}")
+
+
+if __name__ == "__main__":
+    main()
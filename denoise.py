@@ -0,0 +1,158 @@
+import os
+from concurrent.futures import as_completed
+
+from audio_extract import PcmAudio, PCM_DTYPE
+from job_manager import process_pool
+from lazy_imports import lazy_module
+from media_store import media_store, artifact_name
+
+np = lazy_module("numpy")
+
+# STFT size and hop at 16 kHz: 32 ms windows, 75% overlap
+DENOISE_N_FFT = int(os.environ.get("DENOISE_N_FFT", "512"))
+DENOISE_HOP = DENOISE_N_FFT // 4
+# Attenuation of bins gated as noise, and how far above the noise mean (in std devs) a bin must be to pass
+DENOISE_REDUCTION_DB = float(os.environ.get("DENOISE_REDUCTION_DB", "12"))
+DENOISE_THRESHOLD_STD = float(os.environ.get("DENOISE_THRESHOLD_STD", "1.5"))
+# Length of the independent blocks sent to the process pool
+DENOISE_BLOCK_SECONDS = int(os.environ.get("DENOISE_BLOCK_SECONDS", "30"))
+DENOISE_PROCESSES = int(os.environ.get("DENOISE_PROCESSES", str(max(1, (os.cpu_count() or 2) - 1))))
+# Pause audio used to estimate the noise profile
+NOISE_PROFILE_SECONDS = float(os.environ.get("NOISE_PROFILE_SECONDS", "20"))
+
+# Frames averaged on each side when smoothing the gate mask over time and frequency
+_SMOOTH = 1
+# Extra samples read on each side of a block so every output sample sees all the frames
+# (and mask neighbours) it would see in a whole-signal STFT; a multiple of the hop
+_PAD = DENOISE_N_FFT + _SMOOTH * DENOISE_HOP
+
+
+def _window():
+    # Periodic Hann; at 75% overlap sum(w^2) over the frames covering a sample is 1.5
+    return (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(DENOISE_N_FFT) / DENOISE_N_FFT)).astype(PCM_DTYPE)
+
+
+def _frames(signal):
+    count = 1 + (len(signal) - DENOISE_N_FFT) // DENOISE_HOP
+    return np.lib.stride_tricks.as_strided(
+        signal, shape=(count, DENOISE_N_FFT), strides=(signal.strides[0] * DENOISE_HOP, signal.strides[0])
+    )
+
+
+def _padded(samples, start, end, pad):
+    """samples[start - pad:end + pad], zero-filled past either end of the track."""
+    out = np.zeros(end - start + 2 * pad, dtype=PCM_DTYPE)
+    lo, hi = max(start - pad, 0), min(end + pad, len(samples))
+    out[lo - (start - pad):hi - (start - pad)] = samples[lo:hi]
+    return out
+
+
+def noise_profile(audio, pauses, seconds=NOISE_PROFILE_SECONDS):
+    """
+    Per-frequency gate threshold: mean + DENOISE_THRESHOLD_STD x std of the
+    STFT magnitude over up to `seconds` of pause audio. Without usable
+    pauses, the quietest 10% of frames of the first minute stand in.
+    """
+    samples = audio.samples()
+    window = _window()
+    budget = int(seconds * audio.sample_rate)
+    pieces = []
+    for start, end in pauses.pauses:
+        if end - start >= DENOISE_N_FFT and budget > 0:
+            take = min(end - start, budget)
+            pieces.append(np.asarray(samples[start:start + take]))
+            budget -= take
+
+    if pieces:
+        magnitudes = np.concatenate([np.abs(np.fft.rfft(_frames(p) * window)) for p in pieces])
+    else:
+        head = np.asarray(samples[:60 * audio.sample_rate])
+        if len(head) < DENOISE_N_FFT:
+            return np.zeros(DENOISE_N_FFT // 2 + 1, dtype=PCM_DTYPE)
+        magnitudes = np.abs(np.fft.rfft(_frames(head) * window))
+        energy = magnitudes.sum(axis=1)
+        magnitudes = magnitudes[energy <= np.percentile(energy, 10)]
+    return (magnitudes.mean(axis=0) + DENOISE_THRESHOLD_STD * magnitudes.std(axis=0)).astype(PCM_DTYPE)
+
+
+def _smooth(mask):
+    """Average a (frames, bins) mask with its neighbours along both axes."""
+    for axis in (0, 1):
+        padded = np.pad(mask, [(_SMOOTH, _SMOOTH) if a == axis else (0, 0) for a in (0, 1)], mode="edge")
+        length = mask.shape[axis]
+        mask = sum(
+            np.take(padded, range(offset, offset + length), axis=axis) for offset in range(2 * _SMOOTH + 1)
+        ) / (2 * _SMOOTH + 1)
+    return mask
+
+
+def denoise_block(src_path, dst_path, num_samples, start, end, threshold, reduction_db=DENOISE_REDUCTION_DB):
+    """
+    Gate samples [start, end) of the float32 PCM file `src_path` into the
+    same range of the preallocated `dst_path`. `start` must be a multiple of
+    the hop. Blocks are independent, so they can run in any process and
+    order and still write exactly what a whole-signal pass would.
+    """
+    samples = np.memmap(src_path, dtype=PCM_DTYPE, mode="r", shape=(num_samples,))
+    segment = _padded(samples, start, end, _PAD)
+    window = _window()
+
+    spectrum = np.fft.rfft(_frames(segment) * window)
+    magnitude = np.abs(spectrum)
+    floor = 10 ** (-reduction_db / 20)
+    mask = _smooth((magnitude > threshold).astype(PCM_DTYPE))
+    spectrum *= floor + (1 - floor) * mask
+
+    # Overlap-add the gated frames back; 1.5 is the Hann^2 sum at 75% overlap
+    frames = np.fft.irfft(spectrum, n=DENOISE_N_FFT).astype(PCM_DTYPE) * window
+    output = np.zeros(len(segment), dtype=PCM_DTYPE)
+    for offset in range(0, DENOISE_N_FFT, DENOISE_HOP):
+        # Frames k, k+4, ... do not overlap each other, so each group adds in one slice
+        group = frames[offset // DENOISE_HOP::DENOISE_N_FFT // DENOISE_HOP].reshape(-1)
+        output[offset:offset + len(group)] += group
+    output /= 1.5
+
+    dst = np.memmap(dst_path, dtype=PCM_DTYPE, mode="r+", shape=(num_samples,))
+    dst[start:end] = output[_PAD:_PAD + end - start]
+    dst.flush()
+    del dst
+
+
+def denoise_audio(audio, pauses, reduction_db=DENOISE_REDUCTION_DB, progress=None):
+    """
+    Spectral-gating noise reduction of a PcmAudio, using the pauses of
+    `pauses` to learn the noise. Independent hop-aligned blocks run on a
+    process pool and write straight into a preallocated memory-mapped
+    output, which is stored next to the input in the media store.
+    """
+    base = audio.name.rsplit(".", 1)[0]
+    name = artifact_name("denoise", base, int(reduction_db), suffix=".f32")
+
+    def produce(tmp):
+        if audio.num_samples == 0:
+            open(tmp, "wb").close()
+            return
+        out = np.memmap(tmp, dtype=PCM_DTYPE, mode="w+", shape=(audio.num_samples,))
+        out.flush()
+        del out
+
+        threshold = noise_profile(audio, pauses)
+        block = max(1, DENOISE_BLOCK_SECONDS * audio.sample_rate // DENOISE_HOP) * DENOISE_HOP
+        pool = process_pool("denoise", DENOISE_PROCESSES)
+        futures = [
+            pool.submit(denoise_block, audio.path, tmp, audio.num_samples, start,
+                        min(start + block, audio.num_samples), threshold, reduction_db)
+            for start in range(0, audio.num_samples, block)
+        ]
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                future.result()
+                if progress:
+                    progress(done / len(futures))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    media_store.get_or_create_derived(audio.source, name, produce)
+    return PcmAudio(audio.source, name, audio.sample_rate, audio.num_samples)
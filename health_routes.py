@@ -0,0 +1,44 @@
+import os
+import sqlite3
+
+from flask import jsonify
+
+from job_manager import job_manager
+from translation_cache import translation_cache
+
+
+def register_health_routes(server):
+    """
+    Register probe endpoints for the process manager / load balancer.
+
+    GET /healthz -> 200 while the process can serve requests at all (liveness)
+    GET /readyz  -> 200 when it should receive traffic: the job store is
+                    reachable and the worker is not draining; 503 otherwise
+    GET /metrics -> JSON counters of the worker that answers: translation cache
+                    hits/misses/coalesced requests and active jobs
+    """
+
+    @server.route("/healthz", methods=["GET"])
+    def healthz():
+        return jsonify({"status": "ok"})
+
+    @server.route("/readyz", methods=["GET"])
+    def readyz():
+        checks = {"accepting_jobs": job_manager.accepting}
+        try:
+            job_manager.store.ping()
+            checks["job_store"] = True
+        except sqlite3.Error:
+            checks["job_store"] = False
+        ready = all(checks.values())
+        body = {"status": "ready" if ready else "unavailable", "active_jobs": job_manager.active_count(), **checks}
+        return jsonify(body), 200 if ready else 503
+
+    @server.route("/metrics", methods=["GET"])
+    def metrics():
+        # Counters are per worker process; scrape each worker (or sum) for totals
+        return jsonify({
+            "pid": os.getpid(),
+            "active_jobs": job_manager.active_count(),
+            "translation_cache": translation_cache.stats(),
+        })
@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import os
+import threading
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Callback responses smaller than this are sent as-is; compressing them costs more than it saves
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+# Fast settings for per-request compression; the cached layout uses the maximum
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+
+_COMPRESSIBLE = ("application/json", "text/html", "text/plain", "application/javascript", "text/css")
+
+
+def _accepted(token):
+    header = request.headers.get("Accept-Encoding", "")
+    return any(part.split(";")[0].strip() in (token, "*") for part in header.split(","))
+
+
+def _choose_encoding(variants):
+    """Best encoding in `variants` the client accepts: 'br', 'gzip' or None."""
+    for token in ("br", "gzip"):
+        if token in variants and _accepted(token):
+            return token
+    return None
+
+
+def _compress(data, token, best=False):
+    if token == "br":
+        return brotli.compress(data, quality=11 if best else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if best else GZIP_LEVEL, mtime=0)
+
+
+class _Precomputed:
+    """A response body serialised once, with its ETag and compressed copies."""
+
+    def __init__(self, body, mimetype, cache_control):
+        self.mimetype = mimetype
+        # Always revalidate unless Dash chose a policy (component suites are versioned)
+        self.cache_control = cache_control or "no-cache"
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.bodies = {None: body, "gzip": _compress(body, "gzip", best=True)}
+        if brotli is not None:
+            self.bodies["br"] = _compress(body, "br", best=True)
+
+    def response(self):
+        encoding = _choose_encoding(self.bodies)
+        response = Response(self.bodies[encoding], mimetype=self.mimetype)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = self.cache_control
+        response.set_etag(self.etag)
+        return response.make_conditional(request)
+
+
+def register_http_caching(app):
+    """
+    Cache and compress Dash's own HTTP responses.
+
+    `_dash-layout`, `_dash-dependencies` and the component suite bundles are
+    serialised on the first request, then answered from memory with an ETag
+    (304 on revalidation) and a precompressed body. The layout is skipped
+    when it is a function, since it can then differ per request. Other
+    JSON/text responses larger than COMPRESS_MIN_BYTES, such as callback
+    results, are compressed with brotli (when installed) or gzip. Streams
+    and file responses are left alone; they handle their own delivery.
+    """
+    prefix = app.config.routes_pathname_prefix
+    static_paths = {f"{prefix}_dash-layout", f"{prefix}_dash-dependencies"}
+    suites_prefix = f"{prefix}_dash-component-suites/"
+    precomputed = {}
+    lock = threading.Lock()
+    server = app.server
+
+    def cacheable(path):
+        if request.method != "GET":
+            return False
+        if path.startswith(suites_prefix):
+            return True
+        return path in static_paths and not (path.endswith("_dash-layout") and callable(app.layout))
+
+    @server.before_request
+    def serve_precomputed():
+        entry = precomputed.get(request.path)
+        if entry is not None and cacheable(request.path):
+            return entry.response()
+        return None
+
+    @server.after_request
+    def cache_and_compress(response):
+        if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+            return response
+        # Already encoded, or already negotiated (precomputed, static asset variants)
+        if "Content-Encoding" in response.headers or "accept-encoding" in response.vary:
+            return response
+
+        if cacheable(request.path):
+            with lock:
+                if request.path not in precomputed:
+                    precomputed[request.path] = _Precomputed(
+                        response.get_data(), response.mimetype, response.headers.get("Cache-Control")
+                    )
+            return precomputed[request.path].response()
+
+        if response.mimetype not in _COMPRESSIBLE:
+            return response
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_BYTES:
+            return response
+        encoding = _choose_encoding({"br", "gzip"} if brotli is not None else {"gzip"})
+        response.vary.add("Accept-Encoding")
+        if encoding is None:
+            return response
+        response.set_data(_compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        return response
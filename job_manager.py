@@ -0,0 +1,392 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# The job table lives in SQLite so every worker process sees the same job state,
+# whichever worker happens to receive the polling request.
+JOB_DB_PATH = os.environ.get(
+    "JOB_DB_PATH", os.path.join(tempfile.gettempdir(), "bhashasetu", "jobs.sqlite3")
+)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_TTL_SECONDS = int(os.environ.get("JOB_TTL_SECONDS", str(24 * 3600)))
+# Unfinished jobs not updated for this long belong to a worker that died (e.g. was
+# SIGKILLed before draining); they are failed when a process opens the store
+JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", "1800"))
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    stage TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_stages (
+    job_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    weight REAL NOT NULL DEFAULT 1,
+    status TEXT NOT NULL,
+    fraction REAL NOT NULL DEFAULT 0,
+    started_at REAL,
+    ended_at REAL,
+    PRIMARY KEY (job_id, name)
+);
+"""
+# Columns added after the first release of the jobs table
+_JOB_COLUMNS = {
+    "progress": "REAL NOT NULL DEFAULT 0",
+    "stage": "TEXT",
+}
+
+
+class JobStore:
+    """SQLite-backed record of background jobs and their results."""
+
+    def __init__(self, path=JOB_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._recovered_pid = None
+
+    def _conn(self):
+        # One connection per thread, and never reuse a connection inherited across fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, definition in _JOB_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            if self._recovered_pid != os.getpid():
+                self._recovered_pid = os.getpid()
+                self._fail_stale(conn)
+        return conn
+
+    def _fail_stale(self, conn):
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE status IN (?, ?) AND updated_at < ?",
+            (FAILED, "Server restarted before the job finished; please retry", time.time(),
+             PENDING, RUNNING, time.time() - JOB_STALE_SECONDS),
+        )
+        if cursor.rowcount:
+            logger.warning("Marked %d stale job(s) as failed", cursor.rowcount)
+
+    def create(self, kind):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO jobs (id, kind, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, PENDING, now, now),
+        )
+        cutoff = now - JOB_TTL_SECONDS
+        conn.execute("DELETE FROM job_stages WHERE job_id IN (SELECT id FROM jobs WHERE updated_at < ?)", (cutoff,))
+        conn.execute("DELETE FROM jobs WHERE updated_at < ?", (cutoff,))
+        return job_id
+
+    def _update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._conn().execute(
+            f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id)
+        )
+
+    def set_running(self, job_id):
+        self._update(job_id, status=RUNNING)
+
+    def set_result(self, job_id, result):
+        """Store a partial result while the job keeps running."""
+        self._update(job_id, result=json.dumps(result))
+
+    def finish(self, job_id, result):
+        self._update(job_id, status=DONE, result=json.dumps(result), progress=1.0, stage=None)
+
+    def ping(self):
+        """Raise if the job database cannot be reached."""
+        self._conn().execute("SELECT 1").fetchone()
+
+    def fail(self, job_id, error):
+        self._update(job_id, status=FAILED, error=error)
+
+    def plan_stages(self, job_id, stages):
+        """Record the stages a job will run, as (name, weight) pairs in order."""
+        self._conn().executemany(
+            "INSERT OR REPLACE INTO job_stages (job_id, name, position, weight, status) VALUES (?, ?, ?, ?, ?)",
+            [(job_id, name, position, weight, PENDING) for position, (name, weight) in enumerate(stages)],
+        )
+
+    def update_stage(self, job_id, name, status=None, fraction=None):
+        """Record a stage transition or fractional progress and refresh the job's overall progress."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT status FROM job_stages WHERE job_id = ? AND name = ?", (job_id, name)
+            ).fetchone()
+            if row is None:
+                # Unplanned stage: append it with a weight of one
+                position = conn.execute(
+                    "SELECT COUNT(*) FROM job_stages WHERE job_id = ?", (job_id,)
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO job_stages (job_id, name, position, status) VALUES (?, ?, ?, ?)",
+                    (job_id, name, position, PENDING),
+                )
+            if status == RUNNING:
+                conn.execute(
+                    "UPDATE job_stages SET status = ?, fraction = 0, started_at = ? WHERE job_id = ? AND name = ?",
+                    (RUNNING, now, job_id, name),
+                )
+            elif status == DONE:
+                conn.execute(
+                    "UPDATE job_stages SET status = ?, fraction = 1, ended_at = ? WHERE job_id = ? AND name = ?",
+                    (DONE, now, job_id, name),
+                )
+            elif status == FAILED:
+                conn.execute(
+                    "UPDATE job_stages SET status = ?, ended_at = ? WHERE job_id = ? AND name = ?",
+                    (FAILED, now, job_id, name),
+                )
+            if fraction is not None and status is None:
+                conn.execute(
+                    "UPDATE job_stages SET fraction = ? WHERE job_id = ? AND name = ?",
+                    (min(max(fraction, 0.0), 1.0), job_id, name),
+                )
+
+            total, done = conn.execute(
+                "SELECT SUM(weight), SUM(weight * fraction) FROM job_stages WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            running = conn.execute(
+                "SELECT name FROM job_stages WHERE job_id = ? AND status = ? ORDER BY position LIMIT 1",
+                (job_id, RUNNING),
+            ).fetchone()
+            conn.execute(
+                "UPDATE jobs SET progress = ?, stage = ?, updated_at = ? WHERE id = ?",
+                ((done or 0) / total if total else 0.0, running["name"] if running else None, now, job_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_stages(self, job_id):
+        """Stages of a job in order, with their wall-clock durations (seconds) once finished."""
+        rows = self._conn().execute(
+            "SELECT name, position, weight, status, fraction, started_at, ended_at "
+            "FROM job_stages WHERE job_id = ? ORDER BY position",
+            (job_id,),
+        ).fetchall()
+        stages = []
+        for row in rows:
+            stage = dict(row)
+            if stage["started_at"] and stage["ended_at"]:
+                stage["duration"] = round(stage["ended_at"] - stage["started_at"], 3)
+            else:
+                stage["duration"] = None
+            stages.append(stage)
+        return stages
+
+    def get(self, job_id):
+        """Return the job as a dict, or None if it does not exist (or expired)."""
+        if not job_id:
+            return None
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+class Job:
+    """Handle passed to a running job function."""
+
+    def __init__(self, store, job_id):
+        self.store = store
+        self.id = job_id
+
+    def update(self, result):
+        self.store.set_result(self.id, result)
+
+    def plan(self, stages):
+        """
+        Declare the stages this job will run, as names or (name, weight)
+        pairs, so overall progress is measured against the whole job.
+        """
+        self.store.plan_stages(self.id, [
+            stage if isinstance(stage, tuple) else (stage, 1) for stage in stages
+        ])
+
+    def progress(self, stage, fraction):
+        """Report fractional progress (0..1) of a running stage."""
+        self.store.update_stage(self.id, stage, fraction=fraction)
+
+    @contextmanager
+    def stage(self, name):
+        """Run a block as a named stage, recording its start, end and outcome."""
+        self.store.update_stage(self.id, name, status=RUNNING)
+        try:
+            yield
+        except BaseException:
+            self.store.update_stage(self.id, name, status=FAILED)
+            raise
+        self.store.update_stage(self.id, name, status=DONE)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def thread_pool(name, max_workers):
+    """
+    Return the named ThreadPoolExecutor of the current process.
+
+    Threads do not survive fork, so pools are keyed by pid and each worker
+    process lazily gets its own.
+    """
+    key = (name, os.getpid())
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+    return pool
+
+
+def process_pool(name, max_workers):
+    """
+    Return the named ProcessPoolExecutor of the current process, for
+    CPU-bound work that should not hold the GIL of a web worker.
+
+    Children are started with "spawn": forking a process that is running
+    request and job threads could copy locks held by those threads.
+    """
+    key = ("process:" + name, os.getpid())
+    pool = _pools.get(key)
+    # A pool whose child died (e.g. OOM-killed) rejects all work; replace it
+    if pool is None or getattr(pool, "_broken", False):
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None or getattr(pool, "_broken", False):
+                pool = _pools[key] = ProcessPoolExecutor(
+                    max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+    return pool
+
+
+class JobManager:
+    """
+    Runs job functions on a bounded thread pool and records their outcome.
+
+    `fn(job, *args, **kwargs)` must return a JSON-serialisable result.
+    """
+
+    def __init__(self, store, max_workers=JOB_WORKERS):
+        self.store = store
+        self.max_workers = max_workers
+        self.accepting = True
+        # Jobs submitted in this process that have not finished yet
+        self._active = set()
+        self._active_pid = os.getpid()
+        self._active_lock = threading.Condition()
+
+    def _active_jobs(self):
+        # A forked worker starts with none of its parent's jobs
+        if self._active_pid != os.getpid():
+            self._active, self._active_pid = set(), os.getpid()
+        return self._active
+
+    def submit(self, kind, fn, *args, **kwargs):
+        if not self.accepting:
+            raise RuntimeError("Server is shutting down; please retry")
+        job_id = self.store.create(kind)
+        with self._active_lock:
+            self._active_jobs().add(job_id)
+        thread_pool("job", self.max_workers).submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        try:
+            self.store.set_running(job_id)
+            try:
+                result = fn(Job(self.store, job_id), *args, **kwargs)
+            except Exception as e:
+                logger.exception("Job %s failed", job_id)
+                self.store.fail(job_id, str(e))
+            else:
+                self.store.finish(job_id, result)
+        finally:
+            with self._active_lock:
+                self._active_jobs().discard(job_id)
+                self._active_lock.notify_all()
+
+    def active_count(self):
+        with self._active_lock:
+            return len(self._active_jobs())
+
+    def drain(self, timeout):
+        """
+        Stop accepting jobs and wait up to `timeout` seconds for this
+        process's running jobs to finish. Jobs still running after that are
+        marked failed, so clients polling them are not left waiting on a
+        process that is going away. Returns the number of such jobs.
+        """
+        self.accepting = False
+        deadline = time.monotonic() + timeout
+        with self._active_lock:
+            while self._active_jobs() and time.monotonic() < deadline:
+                self._active_lock.wait(deadline - time.monotonic())
+            unfinished = list(self._active_jobs())
+        for job_id in unfinished:
+            self.store.fail(job_id, "Server restarted before the job finished; please retry")
+        if unfinished:
+            logger.warning("Abandoned %d unfinished job(s) on shutdown", len(unfinished))
+        return len(unfinished)
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def snapshot(self, job_id):
+        """The small status/progress view of a job that the UI renders, or None."""
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        return {
+            "status": job["status"],
+            "progress": job["progress"],
+            "stage": job["stage"],
+            "error": job["error"],
+            # Names of the media outputs a finished job published (see media_routes)
+            "outputs": sorted((job["result"] or {}).get("outputs", {})) if isinstance(job["result"], dict) else [],
+        }
+
+
+job_manager = JobManager(JobStore())
@@ -0,0 +1,74 @@
+import json
+import os
+import threading
+import time
+
+from flask import Response, jsonify
+
+from job_manager import job_manager, DONE, FAILED
+
+# How often an event stream re-reads the job store, and how long one stream lives
+# before the browser's EventSource transparently reconnects
+EVENT_POLL_SECONDS = 0.5
+EVENT_STREAM_SECONDS = int(os.environ.get("EVENT_STREAM_SECONDS", "30"))
+KEEPALIVE_SECONDS = 15
+# Every open stream holds a web thread; above this many per worker, requests get a
+# 503 and the page falls back to interval polling (assets/job-events.js)
+EVENT_STREAMS_PER_WORKER = int(os.environ.get("EVENT_STREAMS_PER_WORKER", "2"))
+
+_stream_slots = threading.BoundedSemaphore(EVENT_STREAMS_PER_WORKER)
+
+
+def _job_events(job_id):
+    last_state = None
+    last_sent = started = time.monotonic()
+    yield "retry: 2000\n\n"
+    # Ends when the worker starts shutting down; EventSource reconnects to another one
+    while time.monotonic() - started < EVENT_STREAM_SECONDS and job_manager.accepting:
+        state = job_manager.snapshot(job_id)
+        if state is None:
+            return
+        now = time.monotonic()
+        if state != last_state:
+            yield f"data: {json.dumps(state)}\n\n"
+            last_state, last_sent = state, now
+            if state["status"] in (DONE, FAILED):
+                return
+        elif now - last_sent >= KEEPALIVE_SECONDS:
+            yield ": keep-alive\n\n"
+            last_sent = now
+        time.sleep(EVENT_POLL_SECONDS)
+
+
+def register_job_routes(server):
+    """
+    Register job endpoints on the Flask server.
+
+    GET /jobs/<id>          -> job status, overall progress and per-stage timings
+    GET /jobs/<id>/events   -> text/event-stream of status snapshots, sent only
+                               when they change and closed once the job ends;
+                               503 when the worker has no free stream slot
+    """
+
+    @server.route("/jobs/<job_id>", methods=["GET"])
+    def job_status(job_id):
+        job = job_manager.get(job_id)
+        if job is None:
+            return jsonify(error="Unknown job"), 404
+        job["stages"] = job_manager.store.get_stages(job_id)
+        return jsonify(job)
+
+    @server.route("/jobs/<job_id>/events", methods=["GET"])
+    def job_events(job_id):
+        if job_manager.get(job_id) is None:
+            return jsonify(error="Unknown job"), 404
+        if not job_manager.accepting or not _stream_slots.acquire(blocking=False):
+            return jsonify(error="Too many event streams; poll /jobs/<id> instead"), 503
+        response = Response(
+            _job_events(job_id),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        # Called by the WSGI server when the stream ends or the client goes away
+        response.call_on_close(_stream_slots.release)
+        return response
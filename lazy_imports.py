@@ -0,0 +1,79 @@
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import types
+
+# Media stack used by the video stages; none of it is needed to render the first page
+HEAVY_MODULES = ("numpy", "imageio_ffmpeg")
+# Set to 1 to import HEAVY_MODULES in the master process before workers fork
+PRELOAD_HEAVY_MODULES = os.environ.get("PRELOAD_HEAVY_MODULES", "0") == "1"
+
+_lock = threading.RLock()
+
+
+class _LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that imports it on the first attribute access.
+
+    The import runs under `_lock`, so threads that touch the module at the
+    same time all wait for the complete module (importlib's LazyLoader can
+    hand a half-initialised module to a second thread).
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_module(name):
+    """
+    Return module `name`, deferring its actual import until the first
+    attribute access. Already-imported modules are returned as they are.
+
+        np = lazy_module("numpy")   # cheap
+        np.zeros(3)                 # numpy is imported here
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if importlib.util.find_spec(name) is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    return _LazyModule(name)
+
+
+def preload_heavy_modules(force=False):
+    """
+    Import HEAVY_MODULES now, so that with a preloading server (gunicorn
+    --preload, see serve.py) workers share them copy-on-write instead of
+    each paying the import on its first video request. A no-op unless
+    PRELOAD_HEAVY_MODULES=1 or `force`. Returns the modules imported.
+    """
+    if not (force or PRELOAD_HEAVY_MODULES):
+        return []
+    loaded = []
+    for name in HEAVY_MODULES:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+        # Touch an attribute so a lazy module is actually executed
+        module.__name__
+        loaded.append(name)
+    return loaded
@@ -1,5 +1,4 @@
-from dash import html, dcc, Input, Output, State
-import dash_bootstrap_components as dbc
+from dash import html, dcc, Input, Output, State, ClientsideFunction
 import dash
 
 # Sample cleaned text lines
@@ -23,12 +22,12 @@ Isolate the audio stream from the video.
 Audio Format Normalization
 Convert audio to a standard format and bitrate.
 
-Noise Reduction and Denoising
-Filter background noise and enhance speech clarity.
-
 Silence and Pause Detection
 Mark natural breaks for alignment and synthesis planning.
 
+Noise Reduction and Denoising
+Filter background noise and enhance speech clarity.
+
 Speaker Diarization and Identification
 Detect who is speaking and segment by speaker identity.
 
@@ -134,120 +133,51 @@ lines = [
     if line.strip()
 ]
 
-TOTAL_DURATION_MS = 60000
-INTERVAL_MS = TOTAL_DURATION_MS // len(lines)
-
 def get_line_processor_layout():
     """
     Generates the layout for the line processor display.
-    Includes a title, a div for displaying lines, and dcc.Interval components
-    for timing the display.
+    Includes a div for displaying lines, the stage list (shipped to the
+    browser once) and the index of the stage being processed.
     """
     return html.Div([
       
         html.Div(id='line-display-div', className='media-section1'),
-        # Main interval for updating lines, initially disabled
-        dcc.Interval(id='line-interval', interval=INTERVAL_MS, n_intervals=0, disabled=True),
-        # Delay interval: fires once after 2 seconds to enable the main interval
-        dcc.Interval(id='start-delay', interval=22000, n_intervals=0, max_intervals=1),
+        # Stage list, rendered entirely in the browser by assets/line-ticker.js
+        dcc.Store(id='line-stages', data=lines),
         # dcc.Store to keep track of the current line index
         dcc.Store(id='line-current-index', data=0),
     ], style={'maxWidth': '600px', 'margin': '50px auto', 'fontFamily': 'Arial, sans-serif'})
 
 # ------------- Callback Registration ------------------
-def register_line_processor_callbacks(app: dash.Dash):
+def register_line_processor_callbacks(app: dash.Dash, job_state_id='video-job-state'):
     """
     Registers the callbacks for the line processor.
 
+    Both are clientside: the current line index follows the stage the video
+    job reports as running (from the `job_state_id` store), and the visible
+    window is rendered in the browser from that index, so the ticker costs
+    no server requests.
+
     Args:
         app (dash.Dash): The Dash application instance.
+        job_state_id (str): id of the dcc.Store holding the job's status snapshot.
     """
 
-    # Callback to enable the main line interval after the 2-second delay
-    @app.callback(
-        Output('line-interval', 'disabled'),
-        Input('start-delay', 'n_intervals'),
-        prevent_initial_call=True # Prevent this callback from firing on initial load
+    # Point the current line index at the running stage
+    app.clientside_callback(
+        ClientsideFunction(namespace='lineTicker', function_name='follow'),
+        Output('line-current-index', 'data'),
+        Input(job_state_id, 'data'),
+        State('line-stages', 'data'),
+        State('line-current-index', 'data'),
+        prevent_initial_call=True
     )
-    def start_after_delay(n):
-        """
-        Enables the 'line-interval' after the 'start-delay' interval fires once.
-        """
-        # Once start-delay fires (n_intervals becomes 1), disable becomes False
-        return False
-
-    # Main callback to update the displayed lines
-    @app.callback(
-        Output('line-display-div', 'children'), # Updates the content of the display div
-        Output('line-current-index', 'data'),  # Updates the stored current index
-        Output('line-interval', 'disabled', allow_duplicate=True), # Disables the interval when all lines are processed
-        Input('line-interval', 'n_intervals'), # Triggered by the main interval
-        State('line-current-index', 'data'),   # Get the current index from dcc.Store
-        prevent_initial_call=True # Prevent this callback from firing on initial load
+
+    # Render completed / processing / pending lines around the current index
+    app.clientside_callback(
+        ClientsideFunction(namespace='lineTicker', function_name='render'),
+        Output('line-display-div', 'children'),
+        Input('line-current-index', 'data'),
+        State('line-stages', 'data'),
+        prevent_initial_call=True
     )
-    def update_display(n_intervals, current_index):
-        """
-        Updates the display of lines, showing completed, processing, and pending states.
-        It also manages the scrolling window of visible lines.
-        """
-        # Determine the current step (line being processed)
-        step = min(n_intervals, len(lines))
-        max_visible = 5  # Number of lines visible at any given time
-        total = len(lines) # Total number of lines
-
-        # Calculate the start and end indices for the visible window
-        if step <= 2:
-            start_index = 0
-        elif step >= total - 2:
-            start_index = max(0, total - max_visible)
-        else:
-            start_index = step - 2
-
-        end_index = min(start_index + max_visible, total)
-        visible_lines = lines[start_index:end_index]
-
-        display_lines = []
-
-        # Helper function to style each line based on its state
-        def styled_div(content, icon='', bg='#f0f0f0', color='black', bold=False, className='output-area'):
-            return html.Div([
-                html.Span(icon, style={'marginRight': '8px'}),
-                html.Span(content, style={'fontWeight': 'bold' if bold else 'normal'})
-            ], className=className, style={
-                'padding': '10px',
-                'borderRadius': '8px',
-                'marginBottom': '6px',
-                'boxShadow': '0 1px 3px rgba(0,0,0,0.1)',
-                # 'backgroundColor': bg,
-                'color': color,
-                'display': 'flex',
-                'alignItems': 'center',
-                'minHeight': '40px',
-                'transition': 'all 0.3s ease-in-out' # Smooth transitions for styling changes
-            })
-
-        # Populate display_lines with styled divs
-        for idx in range(start_index, end_index):
-            if idx < step:
-                # Line is completed
-                display_lines.append(styled_div(lines[idx], icon='✅', bg='#e8f5e9', color='green', className='line-completed'))
-            elif idx == step:
-                # Line is currently processing
-                display_lines.append(styled_div(
-                    html.Span([
-                        dbc.Spinner(size="sm", color="primary", type="border", spinner_style={"marginRight": "8px"}),
-                        html.Span(lines[idx], style={'fontWeight': 'bold'})
-                    ]),
-                    bg='#e3f2fd', color='#0d47a1', className='line-processing'
-                ))
-            else:
-                # Line is pending
-                display_lines.append(styled_div(lines[idx], icon='⏳', bg='#f5f5f5', color='gray', className='line-pending'))
-
-        # Fill remaining visible slots with empty divs if fewer than max_visible lines are left
-        while len(display_lines) < max_visible:
-            display_lines.append(styled_div('', icon='', bg='#f5f5f5', color='gray'))
-
-        # Check if all lines have been processed
-        is_disabled = step >= len(lines)
-        return display_lines, step, is_disabled
\ No newline at end of file
@@ -0,0 +1,111 @@
+import mimetypes
+import os
+from urllib.parse import quote, urlsplit
+
+from flask import abort, request, send_file
+
+from job_manager import job_manager
+from media_store import media_store, is_digest
+
+# Hand file delivery to the front proxy (nginx X-Accel / X-Sendfile) when it is configured for it
+USE_X_SENDFILE = os.environ.get("MEDIA_X_SENDFILE", "0") == "1"
+BLOB_MAX_AGE = 365 * 24 * 3600
+JOB_MEDIA_MAX_AGE = 3600
+# The only types served inline; the name (for blobs a query parameter) must not make
+# the app origin render HTML, SVG or script, so everything else is an attachment
+INLINE_TYPE_PREFIXES = ("audio/", "video/")
+
+
+def blob_url(digest, name):
+    """URL of a stored object, served under `name` (which also sets its Content-Type)."""
+    return f"/media/blob/{digest}?name={quote(name)}"
+
+
+def blob_path(url):
+    """
+    Local path of an object behind a `blob_url`, or None for any other URL
+    or an object that is no longer stored (e.g. evicted). Counts as a use.
+    """
+    path = urlsplit(url or "").path
+    prefix = "/media/blob/"
+    digest = path[len(prefix):]
+    if not path.startswith(prefix) or not is_digest(digest) or not media_store.has(digest):
+        return None
+    return media_store.object_path(digest)
+
+
+def publish_file(path, name):
+    """
+    Copy a local file (e.g. a TTS clip written by the backend) into the media
+    store and return the URL it is served from. URLs and paths that do not
+    exist on this host are returned unchanged.
+    """
+    if not path or "://" in path or not os.path.isfile(path):
+        return path
+    return blob_url(media_store.ingest_file(path, move=False), name)
+
+
+def _send(path, name, etag, max_age, cache_control):
+    mimetype = mimetypes.guess_type(name)[0] or ""
+    inline = mimetype.startswith(INLINE_TYPE_PREFIXES)
+    if not inline:
+        mimetype = "application/octet-stream"
+    # conditional=True gives Range/206, If-None-Match and If-Modified-Since handling;
+    # the file body goes out through wsgi.file_wrapper (sendfile under gunicorn)
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        as_attachment=not inline or request.args.get("download") == "1",
+        download_name=name,
+        conditional=True,
+        etag=etag,
+        last_modified=os.path.getmtime(path),
+        max_age=max_age,
+    )
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Accept-Ranges"] = "bytes"
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    return response
+
+
+def register_media_routes(server):
+    """
+    Register media delivery endpoints on the Flask server.
+
+    GET /media/blob/<sha256>?name=<file>[&download=1]
+        A content-addressed object. Immutable, so it is cached for a year.
+        Only audio and video are served inline; `name` cannot pick any other
+        Content-Type, so other files download as application/octet-stream.
+    GET /media/jobs/<job_id>/<output>[?download=1]
+        A named output of a finished job (e.g. the rendered video), private to
+        whoever holds the job id.
+    """
+    if USE_X_SENDFILE:
+        server.config["USE_X_SENDFILE"] = True
+
+    @server.route("/media/blob/<digest>", methods=["GET"])
+    def media_blob(digest):
+        if not is_digest(digest) or not media_store.has(digest):
+            abort(404)
+        name = os.path.basename(request.args.get("name") or digest)
+        return _send(
+            media_store.object_path(digest), name, digest, BLOB_MAX_AGE,
+            f"public, max-age={BLOB_MAX_AGE}, immutable",
+        )
+
+    @server.route("/media/jobs/<job_id>/<output>", methods=["GET"])
+    def media_job_output(job_id, output):
+        job = job_manager.get(job_id)
+        result = (job or {}).get("result")
+        if not isinstance(result, dict) or output not in result.get("outputs", {}):
+            abort(404)
+
+        entry = result["outputs"][output]
+        path = media_store.get_derived(result["sha256"], entry["artifact"])
+        if path is None:
+            abort(404)
+        return _send(
+            path, entry.get("filename", entry["artifact"]),
+            f"{result['sha256']}-{entry['artifact']}", JOB_MEDIA_MAX_AGE,
+            f"private, max-age={JOB_MEDIA_MAX_AGE}",
+        )
@@ -0,0 +1,264 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+MEDIA_STORE_DIR = os.environ.get(
+    "MEDIA_STORE_DIR", os.path.join(tempfile.gettempdir(), "bhashasetu", "media")
+)
+
+# Entries unused for longer than the TTL are deleted, and least recently used ones
+# beyond the size budget; nothing used within MIN_AGE is touched (it may be in use)
+MEDIA_STORE_TTL_SECONDS = int(os.environ.get("MEDIA_STORE_TTL_SECONDS", str(3 * 24 * 3600)))
+MEDIA_STORE_MAX_BYTES = int(os.environ.get("MEDIA_STORE_MAX_BYTES", str(20 * 1024 ** 3)))
+MEDIA_STORE_MIN_AGE_SECONDS = int(os.environ.get("MEDIA_STORE_MIN_AGE_SECONDS", "3600"))
+# How often a process sweeps the store, at most
+MEDIA_STORE_SWEEP_SECONDS = int(os.environ.get("MEDIA_STORE_SWEEP_SECONDS", "600"))
+
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+_NAME = re.compile(r"^[\w.\-]+$")
+_BLOCK = 1024 ** 2
+
+
+def file_sha256(path):
+    """SHA-256 of a file, read in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_digest(value):
+    return bool(value) and bool(_DIGEST.match(value))
+
+
+def artifact_name(kind, *params, suffix=""):
+    """Build a derived artifact name such as 'tts-hi.wav' from its parameters."""
+    parts = [kind] + [str(p) for p in params if p not in (None, "")]
+    name = "-".join(parts) + suffix
+    if not _NAME.match(name):
+        raise ValueError(f"Invalid artifact name: {name!r}")
+    return name
+
+
+class MediaStore:
+    """
+    Content-addressed store for source media and everything derived from it.
+
+        objects/ab/<sha256>                 source files, one copy per content
+        derived/ab/<sha256>/<artifact>      outputs computed from that source
+        used/ab/<sha256>                    empty marker touched when the object is used
+
+    Because derived artifacts are keyed by the source hash, re-submitting the
+    same video (for any target language) finds earlier work on disk.
+    Writes go through a temporary file and an atomic rename, so concurrent
+    workers producing the same artifact never expose a partial file.
+
+    Every source object and every source's derived/ directory is an
+    eviction unit; see `evict`. A directory's mtime records its last use;
+    an object's is recorded on its used/ marker, so the object's own mtime
+    (its Last-Modified when served) never changes.
+    """
+
+    def __init__(self, root=MEDIA_STORE_DIR):
+        self.root = root
+        self._swept_at = None
+        self._sweep_lock = threading.Lock()
+
+    def object_path(self, digest):
+        if not is_digest(digest):
+            raise ValueError(f"Invalid content hash: {digest!r}")
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def has(self, digest):
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            return False
+        self._mark_used(digest)
+        return True
+
+    def _used_path(self, digest):
+        return os.path.join(self.root, "used", digest[:2], digest)
+
+    def _mark_used(self, digest):
+        path = self._used_path(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "a").close()
+
+    def _tmp_path(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f".tmp-{uuid.uuid4().hex}")
+
+    def ingest_file(self, path, move=True):
+        """
+        Add `path` to the store and return its SHA-256.
+
+        The file is hashed in a single streaming pass. If the content is
+        already stored the new copy is discarded (when `move` is set).
+        """
+        digest = file_sha256(path)
+        target = self.object_path(digest)
+        if os.path.exists(target):
+            if move:
+                os.remove(path)
+            self._mark_used(digest)
+            return digest
+
+        tmp = self._tmp_path(os.path.dirname(target))
+        if move:
+            shutil.move(path, tmp)
+        else:
+            shutil.copyfile(path, tmp)
+        os.replace(tmp, target)
+        self._mark_used(digest)
+        self.maybe_evict()
+        return digest
+
+    def derived_path(self, digest, name):
+        if not is_digest(digest):
+            raise ValueError(f"Invalid content hash: {digest!r}")
+        if not _NAME.match(name):
+            raise ValueError(f"Invalid artifact name: {name!r}")
+        return os.path.join(self.root, "derived", digest[:2], digest, name)
+
+    def get_derived(self, digest, name):
+        """Path of an existing derived artifact, or None."""
+        path = self.derived_path(digest, name)
+        if not os.path.exists(path):
+            return None
+        _touch(os.path.dirname(path))
+        return path
+
+    def get_or_create_derived(self, digest, name, produce):
+        """
+        Return the path of a derived artifact, calling `produce(tmp_path)` to
+        write it first if it does not exist yet.
+        """
+        path = self.derived_path(digest, name)
+        if os.path.exists(path):
+            _touch(os.path.dirname(path))
+            return path
+
+        tmp = self._tmp_path(os.path.dirname(path))
+        try:
+            produce(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.maybe_evict()
+        return path
+
+    def get_json(self, digest, name):
+        path = self.get_derived(digest, name)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except ValueError:
+            return None
+
+    def put_json(self, digest, name, data):
+        path = self.derived_path(digest, name)
+        tmp = self._tmp_path(os.path.dirname(path))
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        return path
+
+    def _units(self):
+        """(path, bytes, last use) of every object file and derived directory."""
+        units = []
+        for kind in ("objects", "derived"):
+            top = os.path.join(self.root, kind)
+            for shard in _listdir(top):
+                for entry in _listdir(os.path.join(top, shard)):
+                    path = os.path.join(top, shard, entry)
+                    try:
+                        if os.path.isdir(path):
+                            files = [os.path.join(path, f) for f in _listdir(path)]
+                            size = sum(os.path.getsize(f) for f in files)
+                            used = max([os.path.getmtime(path)] + [os.path.getmtime(f) for f in files])
+                        else:
+                            size, used = os.path.getsize(path), os.path.getmtime(path)
+                            marker = self._used_path(entry)
+                            if os.path.exists(marker):
+                                used = max(used, os.path.getmtime(marker))
+                    except (OSError, ValueError):
+                        continue
+                    units.append((path, size, used))
+        return units
+
+    def evict(self, max_bytes=MEDIA_STORE_MAX_BYTES, ttl=MEDIA_STORE_TTL_SECONDS,
+              min_age=MEDIA_STORE_MIN_AGE_SECONDS):
+        """
+        Delete entries unused for `ttl` seconds, then the least recently
+        used ones until the store fits in `max_bytes`. Entries used in the
+        last `min_age` seconds are kept regardless. Returns bytes freed.
+        """
+        now = time.time()
+        units = sorted(self._units(), key=lambda unit: unit[2])
+        total = sum(size for _, size, _ in units)
+        freed = 0
+        for path, size, used in units:
+            if now - used < min_age:
+                break
+            if now - used < ttl and total - freed <= max_bytes:
+                break
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                _remove(self._used_path(os.path.basename(path)))
+            freed += size
+        return freed
+
+    def maybe_evict(self):
+        """Run `evict` if this process has not swept the store recently."""
+        now = time.monotonic()
+        recent = self._swept_at is not None and now - self._swept_at < MEDIA_STORE_SWEEP_SECONDS
+        if recent or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._swept_at = now
+            self.evict()
+        finally:
+            self._sweep_lock.release()
+
+
+def _listdir(path):
+    try:
+        return os.listdir(path)
+    except OSError:
+        return []
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _touch(path):
+    # Record a use for LRU eviction; a unit removed concurrently is not an error
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+media_store = MediaStore()
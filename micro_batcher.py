@@ -0,0 +1,73 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from job_manager import thread_pool
+
+
+class MicroBatcher:
+    """
+    Collects items submitted by many threads into small batches.
+
+    A batch is flushed when it reaches `max_batch_size` items or `max_wait`
+    seconds after its first item arrived, whichever comes first.
+    `flush(items)` must return one result per item, in order; each caller
+    gets its own result through the Future returned by `submit`. Up to
+    `max_concurrent_batches` flushes run at the same time, so collection of
+    the next batch continues while the previous one is in flight.
+    """
+
+    def __init__(self, flush, max_batch_size=16, max_wait=0.01, max_concurrent_batches=4, name="batch"):
+        self.flush = flush
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_concurrent_batches = max_concurrent_batches
+        self.name = name
+        self._queue = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # The collector thread is per process; start a fresh one after fork
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._queue = queue.Queue()
+                    threading.Thread(target=self._collect, name=f"{self.name}-collector", daemon=True).start()
+                    self._pid = pid
+        return self._queue
+
+    def submit(self, item):
+        future = Future()
+        self._ensure_started().put((item, future))
+        return future
+
+    def _collect(self):
+        items = self._queue
+        while True:
+            batch = [items.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(items.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            thread_pool(self.name, self.max_concurrent_batches).submit(self._flush, batch)
+
+    def _flush(self, batch):
+        try:
+            results = self.flush([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
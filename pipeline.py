@@ -0,0 +1,252 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from job_manager import thread_pool, process_pool
+from media_store import media_store
+
+logger = logging.getLogger(__name__)
+
+# Stages of one job that may run at the same time
+PIPELINE_WORKERS = int(os.environ.get("PIPELINE_WORKERS", "4"))
+# Processes for CPU-bound stages (executor="process"), shared by all jobs of a worker
+PIPELINE_PROCESSES = int(os.environ.get("PIPELINE_PROCESSES", str(max(1, (os.cpu_count() or 2) // 2))))
+
+
+@dataclasses.dataclass
+class Step:
+    """One registered pipeline stage."""
+    name: str
+    fn: object
+    inputs: dict
+    outputs: dict
+    weight: float = 1
+    # "thread" for I/O-bound or GIL-releasing work, "process" for pure-Python CPU work
+    executor: str = "thread"
+    # Cache outputs in the media store, keyed by a hash of the inputs
+    cache: bool = False
+    version: int = 1
+
+    @property
+    def slug(self):
+        return re.sub(r"[^a-z0-9]+", "-", self.name.lower()).strip("-")
+
+
+class StepContext:
+    """
+    Passed to every step as its first argument. `progress(fraction)` reports
+    progress within the stage; it is a no-op in process steps, which cannot
+    reach the job store.
+    """
+
+    def __init__(self, name, job=None):
+        self.name = name
+        self.job = job
+
+    def progress(self, fraction):
+        if self.job is not None:
+            self.job.progress(self.name, fraction)
+
+    def __getstate__(self):
+        return {"name": self.name, "job": None}
+
+
+def fingerprint(value):
+    """
+    Stable hash of a step input. Values may provide their own `fingerprint()`
+    (e.g. large audio buffers hashed by file); otherwise they are hashed
+    through their JSON form.
+    """
+    if hasattr(value, "fingerprint"):
+        return value.fingerprint()
+    if dataclasses.is_dataclass(value):
+        value = dataclasses.asdict(value)
+    data = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _dump(value):
+    return value.to_dict() if hasattr(value, "to_dict") else value
+
+
+def _load(kind, data):
+    return kind.from_dict(data) if hasattr(kind, "from_dict") else data
+
+
+def _call(fn, ctx, inputs):
+    # Module-level so process pools can pickle it
+    return fn(ctx, **inputs)
+
+
+class Pipeline:
+    """
+    A DAG of typed steps connected by named artifacts.
+
+    Each step declares the artifacts it consumes (`inputs`) and produces
+    (`outputs`), as {name: type}. A step returns its single output, or a
+    tuple of outputs in declared order. `run` starts every step whose inputs
+    are available, on a thread or process pool, as soon as they are, so
+    independent branches run concurrently. Steps whose inputs can never be
+    produced are skipped, which lets the pipeline list stages that are not
+    implemented for a given input yet.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.steps = {}
+        self._producers = {}
+
+    def step(self, name, inputs=None, outputs=None, weight=1, executor="thread", cache=False, version=1):
+        """Decorator registering `fn(ctx, **inputs)` as the stage `name`."""
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor {executor!r}")
+
+        def register(fn):
+            step = Step(name, fn, dict(inputs or {}), dict(outputs or {}), weight, executor, cache, version)
+            if name in self.steps:
+                raise ValueError(f"Step {name!r} is already registered")
+            for output in step.outputs:
+                if output in self._producers:
+                    raise ValueError(f"{output!r} is already produced by {self._producers[output]!r}")
+            self.steps[name] = step
+            for output in step.outputs:
+                self._producers[output] = name
+            return fn
+        return register
+
+    def dependencies(self, step):
+        """Names of the steps whose outputs `step` consumes."""
+        return {self._producers[i] for i in step.inputs if i in self._producers}
+
+    def plan(self, available):
+        """
+        Split the registered steps into those that can run given the
+        `available` artifact names, in a valid order, and those skipped.
+        """
+        known = set(available)
+        order, remaining = [], list(self.steps.values())
+        progress = True
+        while remaining and progress:
+            progress = False
+            for step in list(remaining):
+                if all(i in known for i in step.inputs):
+                    order.append(step)
+                    known.update(step.outputs)
+                    remaining.remove(step)
+                    progress = True
+        return order, [step.name for step in remaining]
+
+    def critical_path(self, steps, durations=None):
+        """
+        Longest chain of dependent steps, by measured `durations` ({name:
+        seconds}) or by weight. Returns (names, total). Only shortening
+        these steps makes the whole run finish sooner.
+        """
+        names = {step.name for step in steps}
+        cost = {step.name: (durations or {}).get(step.name, step.weight) for step in steps}
+        best = {}
+        for step in steps:  # already in dependency order
+            parents = [best[d] for d in self.dependencies(step) if d in names]
+            chain, total = max(parents, key=lambda p: p[1], default=([], 0))
+            best[step.name] = (chain + [step.name], total + cost[step.name])
+        path, total = max(best.values(), key=lambda p: p[1], default=([], 0))
+        return path, round(total, 3)
+
+    def run(self, job, inputs):
+        """
+        Run every runnable step for `inputs` ({artifact: value}) and return
+        (artifacts, report). Stage status, timings and progress are recorded
+        through `job`. If a step fails, no further steps are started; steps
+        already running are finished before the first error is raised.
+        """
+        steps, skipped = self.plan(inputs)
+        job.plan([(step.name, step.weight) for step in steps])
+        values = dict(inputs)
+        timings = {}
+        pending, running = list(steps), {}
+        error = None
+        pool = thread_pool(f"pipeline-{self.name}", PIPELINE_WORKERS)
+
+        while pending or running:
+            if error is None:
+                for step in [s for s in pending if all(i in values for i in s.inputs)]:
+                    pending.remove(step)
+                    args = {name: values[name] for name in step.inputs}
+                    running[pool.submit(self._execute, job, step, args)] = step
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                try:
+                    outputs, timings[step.name] = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                values.update(outputs)
+
+        if error is not None:
+            raise error
+
+        durations = {name: t["seconds"] for name, t in timings.items()}
+        path, total = self.critical_path(steps, durations)
+        report = {
+            "timings": timings,
+            "skipped": skipped,
+            "critical_path": path,
+            "critical_path_seconds": total,
+        }
+        return values, report
+
+    def _execute(self, job, step, args):
+        """Run one step (from its cache when possible) as a job stage."""
+        with job.stage(step.name):
+            started = time.monotonic()
+            key = self._cache_key(step, args) if step.cache else None
+            outputs = self._cached(step, key) if key else None
+            cached = outputs is not None
+            if not cached:
+                if step.executor == "process":
+                    result = process_pool("pipeline", PIPELINE_PROCESSES).submit(
+                        _call, step.fn, StepContext(step.name), args
+                    ).result()
+                else:
+                    result = _call(step.fn, StepContext(step.name, job), args)
+                outputs = self._outputs(step, result)
+                if key:
+                    media_store.put_json(key, f"step-{step.slug}.json",
+                                         {name: _dump(value) for name, value in outputs.items()})
+            seconds = round(time.monotonic() - started, 3)
+        logger.info("Pipeline %s step %r: %.3fs%s", self.name, step.name, seconds, " (cached)" if cached else "")
+        return outputs, {"seconds": seconds, "cached": cached}
+
+    def _outputs(self, step, result):
+        names = list(step.outputs)
+        if len(names) == 1:
+            result = (result,)
+        if not isinstance(result, tuple) or len(result) != len(names):
+            raise TypeError(f"Step {step.name!r} must return {len(names)} output(s): {names}")
+        outputs = dict(zip(names, result))
+        for name, value in outputs.items():
+            kind = step.outputs[name]
+            if isinstance(kind, type) and not isinstance(value, kind):
+                raise TypeError(f"Step {step.name!r} output {name!r} is {type(value).__name__}, "
+                                f"expected {kind.__name__}")
+        return outputs
+
+    def _cache_key(self, step, args):
+        parts = [self.name, step.name, str(step.version)] + [
+            f"{name}={fingerprint(args[name])}" for name in sorted(args)
+        ]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _cached(self, step, key):
+        data = media_store.get_json(key, f"step-{step.slug}.json")
+        if data is None or set(data) != set(step.outputs):
+            return None
+        return {name: _load(step.outputs[name], value) for name, value in data.items()}
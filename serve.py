@@ -0,0 +1,100 @@
+"""
+Production entry point: runs a Dash app's Flask server under gunicorn.
+
+    python serve.py                 # app.py on 0.0.0.0:8050
+    APP_MODULE=simple_app PORT=8053 python serve.py
+
+Workers are preforked from a master that has already imported the app
+(copy-on-write sharing), each with a pool of threads so long-lived
+requests (uploads, media ranges, job event streams) do not block others.
+On SIGTERM a worker stops accepting jobs at once (so /readyz turns 503 and
+job event streams close), stops taking requests, waits for its background
+jobs to finish for up to JOB_DRAIN_SECONDS, then exits.
+"""
+import importlib
+import multiprocessing
+import os
+import signal
+
+from gunicorn.app.base import BaseApplication
+
+from job_manager import job_manager
+
+APP_MODULE = os.environ.get("APP_MODULE", "app")
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", "8050"))
+# Worker processes; the usual (2 x cores) + 1, capped so preloaded memory stays bounded
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", str(min(2 * multiprocessing.cpu_count() + 1, 12))))
+# Threads per worker; every open job event stream holds one
+WEB_THREADS = int(os.environ.get("WEB_THREADS", "8"))
+REQUEST_TIMEOUT = int(os.environ.get("REQUEST_TIMEOUT", "120"))
+JOB_DRAIN_SECONDS = int(os.environ.get("JOB_DRAIN_SECONDS", "60"))
+
+
+def _stop_accepting():
+    # Refuse new jobs and end open event streams, so gunicorn's wait for open
+    # connections does not use up the graceful timeout before draining starts
+    job_manager.accepting = False
+
+
+def post_worker_init(worker):
+    # gunicorn installs the worker's SIGTERM handler before this hook; chain onto it
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def on_term(signum, frame):
+        _stop_accepting()
+        if callable(previous):
+            previous(signum, frame)
+
+    signal.signal(signal.SIGTERM, on_term)
+
+
+def worker_int(worker):
+    # SIGINT / SIGQUIT
+    _stop_accepting()
+
+
+def worker_exit(server, worker):
+    # Runs in the worker once it has stopped serving requests
+    abandoned = job_manager.drain(JOB_DRAIN_SECONDS)
+    if abandoned:
+        server.log.warning("Worker %s exited with %d unfinished job(s)", worker.pid, abandoned)
+
+
+class DashApplication(BaseApplication):
+    """gunicorn application serving `<module>.app.server`."""
+
+    def __init__(self, module=APP_MODULE, options=None):
+        self.module = module
+        self.options = options or {}
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+        return importlib.import_module(self.module).app.server
+
+
+def default_options():
+    return {
+        "bind": f"{HOST}:{PORT}",
+        "workers": WEB_WORKERS,
+        "worker_class": "gthread",
+        "threads": WEB_THREADS,
+        "preload_app": True,
+        "timeout": REQUEST_TIMEOUT,
+        # Leave time for job draining before the master kills a stopping worker
+        "graceful_timeout": JOB_DRAIN_SECONDS + 10,
+        "keepalive": 5,
+        "post_worker_init": post_worker_init,
+        "worker_int": worker_int,
+        "worker_exit": worker_exit,
+        "accesslog": os.environ.get("ACCESS_LOG", "-"),
+    }
+
+
+if __name__ == "__main__":
+    DashApplication(options=default_options()).run()
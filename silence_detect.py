@@ -0,0 +1,150 @@
+import os
+from dataclasses import dataclass, field
+
+from lazy_imports import lazy_module
+
+np = lazy_module("numpy")
+
+# Analysis frame; energy and zero-crossing rate are measured per frame
+SILENCE_FRAME_MS = int(os.environ.get("SILENCE_FRAME_MS", "20"))
+# Speech starts above floor + HIGH dB and continues down to floor + LOW dB (hysteresis)
+SILENCE_HIGH_DB = float(os.environ.get("SILENCE_HIGH_DB", "12"))
+SILENCE_LOW_DB = float(os.environ.get("SILENCE_LOW_DB", "6"))
+# Frames quieter than this are silence, and frames louder than SPEECH speech, whatever the noise floor
+SILENCE_ABSOLUTE_DB = float(os.environ.get("SILENCE_ABSOLUTE_DB", "-60"))
+SILENCE_SPEECH_DB = float(os.environ.get("SILENCE_SPEECH_DB", "-30"))
+# Quiet frames crossing zero this often are unvoiced speech (s, f, sh), not silence, provided they
+# are at least UNVOICED dB above the noise floor; broadband hiss crosses zero just as often
+SILENCE_ZCR = float(os.environ.get("SILENCE_ZCR", "0.25"))
+SILENCE_UNVOICED_DB = float(os.environ.get("SILENCE_UNVOICED_DB", "3"))
+# Gaps shorter than this are part of the speech around them; blips shorter than MIN_SPEECH are noise
+MIN_PAUSE_MS = int(os.environ.get("MIN_PAUSE_MS", "300"))
+MIN_SPEECH_MS = int(os.environ.get("MIN_SPEECH_MS", "60"))
+# Longest chunk handed to ASR/TTS workers
+CHUNK_MAX_SECONDS = float(os.environ.get("CHUNK_MAX_SECONDS", "30"))
+
+_BLOCK_FRAMES = 1500
+
+
+@dataclass
+class PauseMap:
+    """
+    Pauses in an audio track, as sorted, non-overlapping [start, end)
+    sample ranges. Speech is everything between them.
+    """
+    sample_rate: int
+    num_samples: int
+    pauses: list = field(default_factory=list)
+
+    def speech_segments(self):
+        """[start, end) sample ranges between pauses."""
+        segments, position = [], 0
+        for start, end in self.pauses:
+            if start > position:
+                segments.append((position, start))
+            position = end
+        if position < self.num_samples:
+            segments.append((position, self.num_samples))
+        return segments
+
+    def chunks(self, max_seconds=CHUNK_MAX_SECONDS):
+        """
+        Split the track into consecutive [start, end) ranges of at most
+        `max_seconds`, cutting in the middle of pauses; the cut falls at the
+        last pause that keeps a chunk under the limit. A stretch of speech
+        longer than the limit is cut hard.
+        """
+        limit = max(1, int(max_seconds * self.sample_rate))
+        cuts = [(start + end) // 2 for start, end in self.pauses if 0 < (start + end) // 2 < self.num_samples]
+        chunks, start, candidate = [], 0, None
+        for cut in cuts + [self.num_samples]:
+            while cut - start > limit:
+                end = candidate if candidate is not None and candidate > start else start + limit
+                chunks.append((start, end))
+                start, candidate = end, None
+            candidate = cut
+        if start < self.num_samples:
+            chunks.append((start, self.num_samples))
+        return chunks
+
+    def to_dict(self):
+        return {
+            "sample_rate": self.sample_rate,
+            "num_samples": self.num_samples,
+            "pauses": [list(p) for p in self.pauses],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["sample_rate"], data["num_samples"], [tuple(p) for p in data["pauses"]])
+
+
+def frame_features(samples, frame):
+    """Per-frame energy (dBFS) and zero-crossing rate, in bounded blocks of frames."""
+    count = len(samples) // frame
+    energy = np.empty(count, dtype="float32")
+    zcr = np.empty(count, dtype="float32")
+    for first in range(0, count, _BLOCK_FRAMES):
+        last = min(first + _BLOCK_FRAMES, count)
+        frames = np.asarray(samples[first * frame:last * frame]).reshape(-1, frame)
+        power = np.einsum("ij,ij->i", frames, frames) / frame
+        energy[first:last] = 10 * np.log10(np.maximum(power, 1e-12))
+        signs = np.signbit(frames)
+        zcr[first:last] = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame - 1)
+    return energy, zcr
+
+
+def _runs(mask):
+    """(starts, ends) of the runs of True in a boolean array."""
+    edges = np.diff(np.concatenate(([False], mask, [False])).astype("int8"))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def detect_pauses(audio, min_pause_ms=MIN_PAUSE_MS, min_speech_ms=MIN_SPEECH_MS):
+    """
+    Build the PauseMap of a PcmAudio.
+
+    Frames are classified against the track's own noise floor (10th
+    percentile of frame energy): a speech run must rise above the high
+    threshold somewhere and extends while frames stay above the low one or
+    look like unvoiced speech (quiet but with a high zero-crossing rate and
+    clearly above the floor, so hiss in the pauses stays silence).
+    Pauses shorter than `min_pause_ms` are then filled in.
+    """
+    frame = max(2, audio.sample_rate * SILENCE_FRAME_MS // 1000)
+    samples = audio.samples()
+    energy, zcr = frame_features(samples, frame)
+    if energy.size == 0:
+        return PauseMap(audio.sample_rate, audio.num_samples, [])
+
+    floor = float(np.percentile(energy, 10))
+    # Capped so a track with no real silence (floor = speech level) still has speech
+    high = max(min(floor + SILENCE_HIGH_DB, SILENCE_SPEECH_DB), SILENCE_ABSOLUTE_DB)
+    low = max(high - (SILENCE_HIGH_DB - SILENCE_LOW_DB), SILENCE_ABSOLUTE_DB)
+    loud = energy > high
+    unvoiced = (zcr > SILENCE_ZCR) & (energy > max(floor + SILENCE_UNVOICED_DB, SILENCE_ABSOLUTE_DB))
+    active = (energy > low) | unvoiced
+
+    # Hysteresis: keep the runs of `active` frames that contain at least one loud
+    # frame, counting loud frames per run from prefix sums
+    starts, ends = _runs(active)
+    prefix = np.concatenate(([0], np.cumsum(loud, dtype="int64")))
+    keep = prefix[ends] - prefix[starts] > 0
+    speech_runs = zip(starts[keep].tolist(), ends[keep].tolist())
+
+    speech = np.zeros(energy.size, dtype=bool)
+    min_speech = max(1, min_speech_ms // SILENCE_FRAME_MS)
+    for start, end in speech_runs:
+        if end - start >= min_speech:
+            speech[start:end] = True
+
+    # Fill gaps shorter than the minimum pause; leading/trailing silence always counts
+    min_pause = max(1, min_pause_ms // SILENCE_FRAME_MS)
+    gap_starts, gap_ends = _runs(~speech)
+    pauses = []
+    for start, end in zip(gap_starts.tolist(), gap_ends.tolist()):
+        edge = start == 0 or end == energy.size
+        if end - start >= min_pause or edge:
+            pauses.append((start * frame, audio.num_samples if end == energy.size else end * frame))
+    return PauseMap(audio.sample_rate, audio.num_samples, pauses)
+
@@ -0,0 +1,46 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The first caller for a key runs `fn`; callers arriving while it is in
+    flight block on the same Future and receive the same result (or
+    exception). Once the call completes the key is forgotten, so later calls
+    run again - pair this with a cache to serve those.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
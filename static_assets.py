@@ -0,0 +1,124 @@
+import json
+import os
+
+from flask import request, send_file
+
+# Output of build_assets.py; when it has not been run, assets are served as-is from assets/
+ASSET_BUILD_DIR = os.environ.get(
+    "ASSET_BUILD_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "build", "assets")
+)
+MANIFEST_NAME = "manifest.json"
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Unversioned asset URLs (no ?m= / ?v=) are revalidated after this long
+ASSET_MAX_AGE = int(os.environ.get("ASSET_MAX_AGE", "3600"))
+
+# Preference order when the client accepts several precompressed encodings
+_ENCODINGS = (("br", "br"), ("gzip", "gz"))
+
+_manifest = None
+_assets_dir = None
+
+
+def load_manifest(build_dir=ASSET_BUILD_DIR):
+    """{asset name: entry} written by build_assets.py, or {} if there is no build."""
+    try:
+        with open(os.path.join(build_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _fresh_entry(name):
+    """
+    Manifest entry of `name`, or None if there is none or the source file in
+    assets/ has changed since build_assets.py ran (size or mtime differ), so
+    an edited asset is never answered with its old build under a new URL.
+    """
+    entry = (_manifest or {}).get(name)
+    if entry is None or _assets_dir is None:
+        return None
+    try:
+        stat = os.stat(os.path.join(_assets_dir, name))
+    except OSError:
+        return None
+    if stat.st_size != entry.get("size") or stat.st_mtime_ns != entry.get("mtime_ns"):
+        return None
+    return entry
+
+
+def asset_url(app, name):
+    """
+    URL of an asset for explicit references (Lottie `url`, html.Link, ...),
+    versioned with its content hash so it can be cached forever.
+    """
+    entry = _fresh_entry(name)
+    url = app.get_asset_url(name)
+    return f"{url}?v={entry['hash']}" if entry else url
+
+
+def _accepts(header, token):
+    return any(part.split(";")[0].strip() == token for part in header.split(","))
+
+
+def _versioned():
+    return "m" in request.args or "v" in request.args
+
+
+def register_static_assets(app):
+    """
+    Serve built asset variants in front of Dash's own /assets/ handler.
+
+    For each request under the assets URL the manifest is consulted: images
+    are answered with their resized WebP variant when the browser accepts
+    it, text assets with a precompressed brotli or gzip copy. Dash already
+    versions auto-included CSS/JS with ?m=<mtime>, and asset_url() adds
+    ?v=<hash>; those URLs get a one-year immutable Cache-Control.
+    """
+    global _manifest, _assets_dir
+    _manifest = load_manifest()
+    _assets_dir = app.config.assets_folder
+    prefix = app.get_asset_url("")
+    server = app.server
+
+    @server.before_request
+    def serve_built_asset():
+        if not _manifest or not request.path.startswith(prefix):
+            return None
+        # Stale or unknown: fall through to Dash's own handler
+        entry = _fresh_entry(request.path[len(prefix):])
+        if entry is None:
+            return None
+
+        variants = entry.get("variants", {})
+        filename, encoding, vary = entry["file"], None, "Accept-Encoding"
+        mimetype = entry["mimetype"]
+        if "webp" in variants:
+            vary = "Accept"
+            if "image/webp" in request.headers.get("Accept", ""):
+                filename, mimetype = variants["webp"], "image/webp"
+        else:
+            accept_encoding = request.headers.get("Accept-Encoding", "")
+            for token, key in _ENCODINGS:
+                if key in variants and _accepts(accept_encoding, token):
+                    filename, encoding = variants[key], token
+                    break
+
+        response = send_file(
+            os.path.join(ASSET_BUILD_DIR, filename),
+            mimetype=mimetype,
+            conditional=True,
+            etag=f"{entry['hash']}-{encoding or os.path.splitext(filename)[1].lstrip('.')}",
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = vary
+        return response
+
+    @server.after_request
+    def asset_cache_headers(response):
+        if request.path.startswith(prefix) and response.status_code in (200, 304):
+            if _versioned():
+                response.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+            else:
+                response.headers["Cache-Control"] = f"public, max-age={ASSET_MAX_AGE}"
+        return response
@@ -0,0 +1,134 @@
+import os
+import re
+from collections import namedtuple
+
+# Longest chunk sent to the backend in one request
+SEGMENT_MAX_CHARS = int(os.environ.get("SEGMENT_MAX_CHARS", "500"))
+
+# Sentence terminators: Latin, Devanagari danda/double danda, Urdu full stop and question mark
+_TERMINATOR = re.compile(r"[.!?।॥۔؟]+[\"'”’)\]]*(?=\s|$)")
+_CLAUSE_BREAK = re.compile(r"[,;:،]\s+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+    "no", "fig", "inc", "ltd", "co", "dept", "govt", "approx", "jan", "feb", "mar",
+    "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+}
+
+# Unicode blocks of the scripts the app translates between
+_SCRIPTS = (
+    ("Devanagari", 0x0900, 0x097F),
+    ("Bengali", 0x0980, 0x09FF),
+    ("Gurmukhi", 0x0A00, 0x0A7F),
+    ("Gujarati", 0x0A80, 0x0AFF),
+    ("Oriya", 0x0B00, 0x0B7F),
+    ("Tamil", 0x0B80, 0x0BFF),
+    ("Telugu", 0x0C00, 0x0C7F),
+    ("Kannada", 0x0C80, 0x0CFF),
+    ("Malayalam", 0x0D00, 0x0D7F),
+    ("Arabic", 0x0600, 0x06FF),
+    ("Latin", 0x0041, 0x024F),
+)
+
+Segment = namedtuple("Segment", ["text", "script", "paragraph_end"])
+
+
+def detect_script(text):
+    """Dominant script of `text` by letter count, or 'Common' if it has no letters."""
+    counts = {}
+    for char in text:
+        if not char.isalpha():
+            continue
+        code = ord(char)
+        for name, first, last in _SCRIPTS:
+            if first <= code <= last:
+                counts[name] = counts.get(name, 0) + 1
+                break
+    return max(counts, key=counts.get) if counts else "Common"
+
+
+def _is_abbreviation(paragraph, start, end):
+    if paragraph[start:end].rstrip("\"'”’)]") != ".":
+        return False
+    word = paragraph[:start].split()[-1] if paragraph[:start].split() else ""
+    word = word.lower().lstrip("(\"'“‘")
+    if word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+        return True
+    # "... approx. three" - a lowercase continuation is not a new sentence
+    following = paragraph[end:].lstrip()
+    return bool(following) and following[0].islower()
+
+
+def split_sentences(paragraph):
+    sentences = []
+    start = 0
+    for match in _TERMINATOR.finditer(paragraph):
+        if _is_abbreviation(paragraph, match.start(), match.end()):
+            continue
+        sentence = paragraph[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    tail = paragraph[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def _split_long(sentence, max_chars):
+    """Break a sentence longer than `max_chars` at clause breaks, then at spaces."""
+    pieces = []
+    while len(sentence) > max_chars:
+        window = sentence[:max_chars + 1]
+        cut = max((m.end() for m in _CLAUSE_BREAK.finditer(window)), default=0)
+        if cut == 0:
+            cut = window.rfind(" ") + 1
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def segment_text(text, max_chars=SEGMENT_MAX_CHARS):
+    """
+    Split `text` into translation chunks of at most `max_chars` characters.
+
+    Chunks follow paragraph and sentence boundaries (Latin and Indic
+    terminators), never mix scripts, and pack consecutive short sentences
+    together so short inputs still go out as a single request.
+    """
+    segments = []
+    for paragraph in _PARAGRAPH_BREAK.split(text.strip()):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+
+        current, current_script = "", None
+        paragraph_segments = []
+        for sentence in split_sentences(paragraph):
+            script = detect_script(sentence)
+            for piece in _split_long(sentence, max_chars):
+                joined = f"{current} {piece}" if current else piece
+                if current and (len(joined) > max_chars or script != current_script):
+                    paragraph_segments.append(Segment(current, current_script, False))
+                    joined = piece
+                current, current_script = joined, script
+        if current:
+            paragraph_segments.append(Segment(current, current_script, False))
+
+        paragraph_segments[-1] = paragraph_segments[-1]._replace(paragraph_end=True)
+        segments.extend(paragraph_segments)
+    return segments
+
+
+def join_segments(texts, segments):
+    """Reassemble translated chunk texts in order, restoring paragraph breaks."""
+    out = []
+    for text, segment in zip(texts, segments):
+        out.append(text)
+        out.append("\n\n" if segment.paragraph_end else " ")
+    return "".join(out).strip()
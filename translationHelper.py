@@ -1,7 +1,21 @@
+import os
+import tempfile
+from concurrent.futures import wait, FIRST_COMPLETED
+
 from dash import html, Input, Output, State, ctx,no_update
 import dash_bootstrap_components as dbc
 import dash
-import requests
+from translation_client import TranslationResult, backend_translate
+from translation_cache import cached_translate
+from job_manager import job_manager, thread_pool, DONE, FAILED
+from text_segmenter import Segment, detect_script, segment_text, join_segments
+from media_routes import publish_file, blob_path
+from audio_merge import merge_sequential
+
+# Upper bound on concurrent per-language backend requests in one worker process
+FANOUT_WORKERS = int(os.environ.get("TRANSLATION_FANOUT_WORKERS", "8"))
+# Extra attempts for a chunk whose translation failed
+CHUNK_RETRIES = int(os.environ.get("TRANSLATION_CHUNK_RETRIES", "2"))
 
 # Dummy translation function
 # def dummy_translate(text, target_lang):
@@ -15,8 +29,9 @@ import requests
 def dummy_translate(text, target_lang, use_backend=True):
     """
     Wrapper for translation.
-    If use_backend=True -> Calls FastAPI backend
+    If use_backend=True -> Calls FastAPI backend through the pooled TranslationClient
     If use_backend=False -> Uses dummy translations
+    Returns a list of TranslationResult.
     """
 
     if not use_backend:
@@ -27,32 +42,20 @@ def dummy_translate(text, target_lang, use_backend=True):
             "gu": ("Gujarati", "હેલો વિશ્વ", "/assets/gujarati.mp3"),
         }
         lang, translated, audio = translations.get(target_lang, ("Unknown", "N/A", ""))
-        return [{
-            "language": target_lang,
-            "translation": translated,
-            "audio_file": audio
-        }]
+        return [TranslationResult(language=target_lang, translation=translated, audio_file=audio)]
 
-    # Call FastAPI backend
-    try:
-        response = requests.post(
-            "http://localhost:8000/text-to-speech",   # FastAPI endpoint
-            json={"source_text": text, "target_languages": target_lang}
-        )
-        if response.status_code == 200:
-            return response.json()  # Already in expected format (list of dicts)
-        else:
-            return [{
-                "language": target_lang,
-                "translation": "Error from backend",
-                "audio_file": ""
-            }]
-    except Exception as e:
-        return [{
-            "language": target_lang,
-            "translation": f"Exception: {str(e)}",
-            "audio_file": ""
-        }]
+    # Call FastAPI backend, answering repeated phrases from the shared cache
+    return cached_translate(text, target_lang, _translate_and_publish)
+
+
+def _translate_and_publish(text, target_lang):
+    # Serve backend audio from the media store (Range/ETag aware) instead of its raw path
+    results = backend_translate(text, target_lang)
+    for result in results:
+        if result.audio_file:
+            ext = os.path.splitext(result.audio_file)[1] or ".wav"
+            result.audio_file = publish_file(result.audio_file, f"{result.language}{ext}")
+    return results
 
 # Dummy audio translation function
 def dummy_audio_translate(audio, target_lang):
@@ -63,10 +66,174 @@ def dummy_audio_translate(audio, target_lang):
     }
     return translations.get(target_lang, ("Unknown", ""))
 
+def translation_row(translation):
+    """Build one html.Tr of the translation table from a TranslationResult."""
+    lang_name = translation.language
+    audio_file = translation.audio_file
+
+    download_name = f"tts_{lang_name}.wav"
+
+    return html.Tr([
+        html.Td(lang_name),
+        html.Td(translation.translation if translation.ok
+                else html.Span(translation.error, className="text-danger")),
+        html.Td([
+            html.Audio(src=audio_file, controls=True,
+                       style={"width": "200px"}) if audio_file else "N/A",
+            html.Br(),
+            html.A(
+                "Download",
+                href=audio_file,
+                download=download_name
+            ) if audio_file else ""
+        ] if audio_file or not translation.audio_parts else [
+            # Long text translated in chunks: one player per chunk
+            html.Audio(src=part, controls=True, style={"width": "200px", "display": "block"})
+            for part in translation.audio_parts
+        ])
+    ])
+
+
+def translation_table(rows):
+    return dbc.Table([
+        html.Thead(html.Tr([
+            html.Th("Language"),
+            html.Th("Translated Text"),
+            html.Th("Audio")
+        ])),
+        html.Tbody(rows)
+    ], bordered=True, striped=True, hover=True)
+
+
+def pending_row(lang):
+    return html.Tr([
+        html.Td(lang),
+        html.Td(html.Span([
+            dbc.Spinner(size="sm", color="primary", spinner_style={"marginRight": "8px"}),
+            "Translating..."
+        ])),
+        html.Td("")
+    ])
+
+
+def join_chunk_results(lang, parts, segments):
+    """
+    Combine the per-chunk results of one language into TranslationResults.
+
+    A request can return several results (e.g. one per language for `df`),
+    so results are joined by position across chunks; chunks that disagree
+    on the number of results fail the language.
+    """
+    if len(parts) == 1:
+        return parts[0]
+
+    # A failed chunk stands in for every position, whatever the others returned
+    failures = [
+        next((r for r in chunk if not r.ok), None) if chunk else TranslationResult.failed(lang, "Empty response")
+        for chunk in parts
+    ]
+    widths = {len(chunk) for chunk, failure in zip(parts, failures) if failure is None}
+    if len(widths) > 1:
+        return [TranslationResult.failed(
+            lang, f"Segments returned different numbers of results: {sorted(widths)}"
+        )]
+    width = widths.pop() if widths else 1
+    return [
+        _join_position(lang, [failure or chunk[position] for chunk, failure in zip(parts, failures)], segments)
+        for position in range(width)
+    ]
+
+
+def _join_position(lang, results, segments):
+    """Join the results at one position of every chunk."""
+    failed = [result for result in results if not result.ok]
+    joined = TranslationResult(
+        language=next((r.language for r in results if r.ok), lang),
+        translation=join_segments([r.translation for r in results], segments),
+        audio_parts=[r.audio_file for r in results if r.audio_file],
+    )
+    if failed:
+        joined.error = f"{len(failed)} of {len(results)} segments failed: {failed[0].error}"
+    elif len(joined.audio_parts) > 1:
+        merged = merge_audio_parts(joined.language, joined.audio_parts)
+        if merged:
+            joined.audio_file, joined.audio_parts = merged, []
+    return joined
+
+
+def merge_audio_parts(lang, urls):
+    """
+    Join the per-chunk TTS clips of one language into a single published
+    track. Returns None (keeping one player per chunk) when a clip is not in
+    the local media store or cannot be decoded.
+    """
+    paths = [blob_path(url) for url in urls]
+    if not all(paths):
+        return None
+    fd, tmp = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        merge_sequential(paths, tmp)
+        return publish_file(tmp, f"{lang}.wav")
+    except (ValueError, OSError):
+        return None
+    finally:
+        os.remove(tmp)
+
+
+def run_translation_job(job, text, langs):
+    """
+    Background job body: translate `text` into every language in `langs`.
+
+    Long text is split into sentence chunks; every (language, chunk) pair is
+    sent concurrently on a bounded pool, failed chunks alone are retried, and
+    each language is published as soon as all of its chunks are back.
+    """
+    segments = segment_text(text) or [Segment(text, detect_script(text), True)]
+    chunks = [segment.text for segment in segments]
+    pool = thread_pool("translate", FANOUT_WORKERS)
+
+    parts = {lang: [None] * len(chunks) for lang in langs}
+    attempts = {}
+    pending = {}
+    results = {}
+
+    def dispatch(lang, index):
+        attempts[lang, index] = attempts.get((lang, index), 0) + 1
+        pending[pool.submit(dummy_translate, chunks[index], lang)] = (lang, index)
+
+    for lang in langs:
+        for index in range(len(chunks)):
+            dispatch(lang, index)
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            lang, index = pending.pop(future)
+            try:
+                translated = future.result()
+            except Exception as e:
+                translated = [TranslationResult.failed(lang, str(e))]
+
+            if not (translated and all(r.ok for r in translated)) and attempts[lang, index] <= CHUNK_RETRIES:
+                dispatch(lang, index)
+                continue
+
+            parts[lang][index] = translated
+            if all(part is not None for part in parts[lang]):
+                joined = join_chunk_results(lang, parts[lang], segments)
+                results[lang] = [result.to_dict() for result in joined]
+                job.update({"languages": langs, "results": results})
+
+    return {"languages": langs, "results": results}
+
+
 def register_callbacks(app):
     @app.callback(
         Output("result-modal-txt", "is_open"),
         Output("translation-table", "children"),
+        Output("txt-job-id", "data"),
+        Output("txt-job-interval", "disabled"),
         Input("txt-translation", "n_clicks"),
         Input("close-modal", "n_clicks"),
         State("target-language", "value"),
@@ -74,53 +241,56 @@ def register_callbacks(app):
         State("result-modal-txt", "is_open"),
         prevent_initial_call=True
     )
-    def show_translation(btn_click, close_click, lang, text, is_open):
+    def show_translation(btn_click, close_click, langs, text, is_open):
         if not ctx.triggered:
-            return is_open, dash.no_update
+            return is_open, dash.no_update, dash.no_update, dash.no_update
 
         trigger = ctx.triggered_id
 
-        if trigger == "txt-translation" and text:
-            results = dummy_translate(text, lang)  # list of dicts from backend
-
-            # Build rows dynamically for each translation
-            rows = []
-            for translation in results:
-                lang_name = translation.get("language", "Unknown")
-                translated_text = translation.get("translation", "N/A")
-                audio_file = translation.get("audio_file", "")
-
-                download_name = f"tts_{lang_name}.wav"
-
-                rows.append(
-                    html.Tr([
-                        html.Td(lang_name),
-                        html.Td(translated_text),
-                        html.Td([
-                            html.Audio(src=audio_file, controls=True,
-                                       style={"width": "200px"}) if audio_file else "N/A",
-                            html.Br(),
-                            html.A(
-                                "Download",
-                                href=audio_file,
-                                download=download_name
-                            ) if audio_file else ""
-                        ])
-                    ])
-                )
-
-            table = dbc.Table([
-                html.Thead(html.Tr([
-                    html.Th("Language"),
-                    html.Th("Translated Text"),
-                    html.Th("Audio")
-                ])),
-                html.Tbody(rows)
-            ], bordered=True, striped=True, hover=True)
-
-            return True, table
+        if isinstance(langs, str):
+            langs = [langs]
+        langs = list(dict.fromkeys(langs or []))
+
+        if trigger == "txt-translation" and text and text.strip() and langs:
+            # Hand the backend calls to a job and return straight away;
+            # poll_translation fills in each row as its language finishes.
+            try:
+                job_id = job_manager.submit("text-translation", run_translation_job, text, langs)
+            except RuntimeError as e:
+                # Worker is draining for a restart
+                return True, html.Span(str(e), className="text-danger"), None, True
+            return True, translation_table([pending_row(lang) for lang in langs]), job_id, False
 
         elif trigger == "close-modal":
-            return False, dash.no_update
+            return False, dash.no_update, None, True
+
+        return is_open, dash.no_update, dash.no_update, dash.no_update
+
+    @app.callback(
+        Output("translation-table", "children", allow_duplicate=True),
+        Output("txt-job-interval", "disabled", allow_duplicate=True),
+        Input("txt-job-interval", "n_intervals"),
+        State("txt-job-id", "data"),
+        prevent_initial_call=True
+    )
+    def poll_translation(n_intervals, job_id):
+        job = job_manager.get(job_id)
+        if job is None:
+            return html.Span("Translation job not found.", className="text-danger"), True
+
+        if job["status"] == FAILED:
+            return html.Span(f"Translation failed: {job['error']}", className="text-danger"), True
+
+        partial = job["result"] or {}
+        results = partial.get("results", {})
+        rows = []
+        for lang in partial.get("languages", []):
+            if lang in results:
+                rows.extend(translation_row(TranslationResult.from_dict(item)) for item in results[lang])
+            else:
+                rows.append(pending_row(lang))
 
-        return is_open, dash.no_update
+        done = job["status"] == DONE
+        if not rows and not done:
+            return dash.no_update, False
+        return translation_table(rows), done
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from flask_caching import Cache
+
+from media_routes import blob_path
+from single_flight import SingleFlight
+from translation_client import TranslationResult
+
+# Shared on-disk tier (all gunicorn workers on the host read the same directory)
+CACHE_DIR = os.environ.get(
+    "TRANSLATION_CACHE_DIR", os.path.join(tempfile.gettempdir(), "bhashasetu", "translation-cache")
+)
+CACHE_TTL_SECONDS = int(os.environ.get("TRANSLATION_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.environ.get("TRANSLATION_CACHE_MAX_ENTRIES", "20000"))
+# Per-process tier in front of the disk, answers hot phrases without any I/O
+MEMORY_MAX_ENTRIES = int(os.environ.get("TRANSLATION_CACHE_MEMORY_ENTRIES", "2048"))
+
+
+def normalize_text(text):
+    """Canonical form of the source text used for cache keys."""
+    text = unicodedata.normalize("NFC", text or "")
+    return " ".join(text.split())
+
+
+def cache_key(text, target_lang):
+    if isinstance(target_lang, (list, tuple)):
+        target_lang = ",".join(sorted(target_lang))
+    digest = hashlib.sha256(f"{normalize_text(text)}\x00{target_lang}".encode("utf-8")).hexdigest()
+    return f"tr:{digest}"
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TranslationCache:
+    """
+    Two-tier cache of backend translation results.
+
+    Values are lists of result dicts. The disk tier is Flask-Caching's
+    FileSystemCache, which bounds the entry count and expires entries after
+    the TTL; the memory tier is a per-process LRU. Hit/miss counters are per
+    process.
+    """
+
+    def __init__(self):
+        self.disk = None
+        self.memory = LRUCache(MEMORY_MAX_ENTRIES, CACHE_TTL_SECONDS)
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "stale_audio": 0}
+
+    def init_app(self, server):
+        # Passing the app keeps the cache usable from job threads without an app context
+        self.disk = Cache(server, config={
+            "CACHE_TYPE": "FileSystemCache",
+            "CACHE_DIR": CACHE_DIR,
+            "CACHE_DEFAULT_TIMEOUT": CACHE_TTL_SECONDS,
+            "CACHE_THRESHOLD": CACHE_MAX_ENTRIES,
+        })
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                self._count("disk_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+        self._count("sets")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats["coalesced"] = translation_flights.coalesced
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+translation_cache = TranslationCache()
+# Identical requests already on their way to the backend (per process)
+translation_flights = SingleFlight()
+
+
+def _audio_available(items):
+    """False if a cached result points at a media blob that is no longer stored."""
+    for item in items:
+        for url in [item.get("audio_file")] + list(item.get("audio_parts") or []):
+            if url and url.startswith("/media/blob/") and blob_path(url) is None:
+                return False
+    return True
+
+
+def cached_translate(text, target_lang, translate):
+    """
+    Return `translate(text, target_lang)` through the cache.
+
+    `translate` returns a list of TranslationResult; only fully successful
+    results are stored, so transient backend errors are retried next time.
+    Concurrent misses on the same key are coalesced: one caller hits the
+    backend and the others share its results, audio file included.
+    """
+    key = cache_key(text, target_lang)
+    cached = translation_cache.get(key)
+    if cached is not None and _audio_available(cached):
+        return [TranslationResult.from_dict(item) for item in cached]
+    if cached is not None:
+        # The media store evicts sooner than this cache expires; translate again
+        translation_cache._count("stale_audio")
+
+    def compute():
+        results = translate(text, target_lang)
+        if results and all(result.ok for result in results):
+            translation_cache.set(key, [result.to_dict() for result in results])
+        return results
+
+    return translation_flights.do(key, compute)
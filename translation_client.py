@@ -0,0 +1,238 @@
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, asdict, field
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from micro_batcher import MicroBatcher
+
+# Backend settings, overridable from the environment
+TRANSLATION_API_URL = os.environ.get("TRANSLATION_API_URL", "http://localhost:8000")
+TRANSLATION_POOL_SIZE = int(os.environ.get("TRANSLATION_POOL_SIZE", os.environ.get("WORKER_THREADS", "10")))
+CONNECT_TIMEOUT = float(os.environ.get("TRANSLATION_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("TRANSLATION_READ_TIMEOUT", "60"))
+MAX_RETRIES = int(os.environ.get("TRANSLATION_MAX_RETRIES", "2"))
+# Cross-request micro-batching; a window of 0 sends every request on its own
+BATCH_WINDOW_MS = float(os.environ.get("TRANSLATION_BATCH_WINDOW_MS", "0"))
+BATCH_MAX_SIZE = int(os.environ.get("TRANSLATION_BATCH_MAX_SIZE", "16"))
+
+# Status codes worth another attempt; anything else is returned to the caller as-is
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+@dataclass
+class TranslationResult:
+    """One translated language as returned by the backend."""
+    language: str
+    translation: str = ""
+    audio_file: str = ""
+    error: str = ""
+    # Per-chunk audio when a long text was translated in several requests
+    audio_parts: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.error
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            language=data.get("language", "Unknown"),
+            translation=data.get("translation", ""),
+            audio_file=data.get("audio_file", "") or "",
+            error=data.get("error", "") or "",
+            audio_parts=list(data.get("audio_parts") or []),
+        )
+
+    @classmethod
+    def failed(cls, language, error):
+        return cls(language=language, error=error)
+
+
+class TranslationClient:
+    """
+    Pooled HTTP client for the FastAPI translation/TTS backend.
+
+    One keep-alive Session is shared by all threads of a worker process, every
+    call is bounded by a connect/read timeout and an overall deadline, and
+    transient failures are retried a bounded number of times with jittered
+    exponential backoff.
+    """
+
+    def __init__(self, base_url=TRANSLATION_API_URL, pool_size=TRANSLATION_POOL_SIZE,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_retries=MAX_RETRIES, backoff=0.5):
+        self.base_url = base_url.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # Flipped off the first time the backend answers the batch route with 404/405
+        self.batch_supported = True
+
+        self.session = requests.Session()
+        # Retries are handled below so they can respect the per-call deadline
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def _post(self, path, payload, deadline):
+        """
+        POST `payload` as JSON, retrying transient failures until `deadline`
+        (a time.monotonic() value). Returns the final response or raises the
+        last requests exception.
+        """
+        url = f"{self.base_url}{path}"
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout(f"Deadline exceeded calling {url}")
+
+            timeout = (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+            try:
+                response = self.session.post(url, json=payload, timeout=timeout)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                response.close()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+
+            # Full jitter keeps retrying workers from hitting the backend in lockstep
+            delay = random.uniform(0, self.backoff * (2 ** attempt))
+            if time.monotonic() + delay >= deadline:
+                raise requests.Timeout(f"Deadline exceeded calling {url}")
+            time.sleep(delay)
+            attempt += 1
+
+    def translate(self, text, target_lang, timeout=None):
+        """
+        Translate `text` and synthesise speech for `target_lang`.
+
+        Always returns a list of TranslationResult; transport and backend
+        errors are reported through `TranslationResult.error` instead of
+        being raised.
+        """
+        deadline = time.monotonic() + (timeout if timeout is not None else self.read_timeout)
+        try:
+            response = self._post(
+                "/text-to-speech",
+                {"source_text": text, "target_languages": target_lang},
+                deadline,
+            )
+        except requests.Timeout:
+            return [TranslationResult.failed(target_lang, "Translation service timed out")]
+        except requests.RequestException as e:
+            return [TranslationResult.failed(target_lang, f"Translation service unavailable: {e}")]
+
+        if response.status_code != 200:
+            return [TranslationResult.failed(target_lang, f"Error from backend (HTTP {response.status_code})")]
+
+        try:
+            return _parse_results(response.json())
+        except ValueError:
+            return [TranslationResult.failed(target_lang, "Invalid response from backend")]
+
+    def translate_batch(self, items, timeout=None):
+        """
+        Translate several `(text, target_lang)` items in one request.
+
+        Posts {"items": [{"source_text", "target_languages"}, ...]} to
+        /text-to-speech/batch and expects one result list per item, in order.
+        Falls back to one request per item if the backend has no batch route.
+        """
+        if not self.batch_supported:
+            return [self.translate(text, lang, timeout) for text, lang in items]
+
+        deadline = time.monotonic() + (timeout if timeout is not None else self.read_timeout)
+        payload = {"items": [{"source_text": text, "target_languages": lang} for text, lang in items]}
+        try:
+            response = self._post("/text-to-speech/batch", payload, deadline)
+        except requests.Timeout:
+            return [[TranslationResult.failed(lang, "Translation service timed out")] for _, lang in items]
+        except requests.RequestException as e:
+            return [[TranslationResult.failed(lang, f"Translation service unavailable: {e}")]
+                    for _, lang in items]
+
+        if response.status_code in (404, 405):
+            self.batch_supported = False
+            return [self.translate(text, lang, timeout) for text, lang in items]
+
+        if response.status_code != 200:
+            return [[TranslationResult.failed(lang, f"Error from backend (HTTP {response.status_code})")]
+                    for _, lang in items]
+
+        try:
+            body = response.json()
+            batches = body["results"] if isinstance(body, dict) else body
+            if len(batches) != len(items):
+                raise ValueError("result count mismatch")
+            return [_parse_results(batch) for batch in batches]
+        except (ValueError, KeyError, TypeError):
+            return [[TranslationResult.failed(lang, "Invalid response from backend")] for _, lang in items]
+
+
+def _parse_results(payload):
+    if isinstance(payload, dict):
+        payload = [payload]
+    return [TranslationResult.from_dict(item) for item in payload]
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide TranslationClient.
+
+    The client is created lazily and re-created after a fork so that worker
+    processes never share pooled sockets with their parent.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = TranslationClient()
+                _client_pid = pid
+    return _client
+
+
+_batcher = None
+
+
+def backend_translate(text, target_lang):
+    """
+    Translate through the backend, joining a cross-request micro-batch when
+    TRANSLATION_BATCH_WINDOW_MS is set and the backend supports batches.
+    """
+    global _batcher
+    client = get_client()
+    if BATCH_WINDOW_MS <= 0 or not client.batch_supported:
+        return client.translate(text, target_lang)
+
+    if _batcher is None:
+        with _client_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(
+                    lambda items: get_client().translate_batch(items),
+                    max_batch_size=BATCH_MAX_SIZE,
+                    max_wait=BATCH_WINDOW_MS / 1000.0,
+                    name="translate-batch",
+                )
+    try:
+        return _batcher.submit((text, target_lang)).result(timeout=client.read_timeout + 5)
+    except Exception as e:
+        return [TranslationResult.failed(target_lang, f"Translation batch failed: {e}")]
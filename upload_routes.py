@@ -0,0 +1,185 @@
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+
+from flask import jsonify, request
+
+from media_store import media_store
+
+UPLOAD_DIR = os.environ.get(
+    "UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "bhashasetu", "uploads")
+)
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(2 * 1024 ** 3)))
+CHUNK_BYTES = 8 * 1024 ** 2
+MAX_CHUNK_BYTES = 2 * CHUNK_BYTES
+UPLOAD_TTL_SECONDS = 24 * 3600
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".mkv", ".webm", ".avi", ".m4v", ".mpeg", ".mpg", ".3gp"}
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+_STREAM_BLOCK = 1024 ** 2
+
+
+def _meta_path(upload_id):
+    return os.path.join(UPLOAD_DIR, f"{upload_id}.json")
+
+
+def _part_path(upload_id):
+    return os.path.join(UPLOAD_DIR, f"{upload_id}.part")
+
+
+def _load_meta(upload_id):
+    if not upload_id or not _UPLOAD_ID.match(upload_id):
+        return None
+    try:
+        with open(_meta_path(upload_id), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_meta(upload_id, meta):
+    tmp = _meta_path(upload_id) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, _meta_path(upload_id))
+
+
+def _received(upload_id):
+    try:
+        return os.path.getsize(_part_path(upload_id))
+    except OSError:
+        return 0
+
+
+def _purge_stale():
+    """
+    Drop uploads untouched for more than a day: abandoned partial files and
+    the metadata of finished ones (their video lives on in the media store
+    until it is evicted there).
+    """
+    cutoff = time.time() - UPLOAD_TTL_SECONDS
+    for name in os.listdir(UPLOAD_DIR):
+        path = os.path.join(UPLOAD_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def resolve_upload(upload_id):
+    """
+    Return the metadata of a completed upload (including its content hash
+    `sha256` and the stored object `path`), or None if the id is unknown or
+    the upload is not finished.
+    """
+    meta = _load_meta(upload_id)
+    if meta is None or not meta.get("complete"):
+        return None
+    # The stored video may have been evicted from the media store since
+    if not media_store.has(meta["sha256"]):
+        return None
+    return meta
+
+
+def register_upload_routes(server):
+    """
+    Register the resumable chunked upload API on the Flask server.
+
+    POST /uploads                   {"filename", "size"} -> {"upload_id", "chunk_size"}
+    GET  /uploads/<id>              -> {"offset", "size", "complete"}
+    PUT  /uploads/<id>?offset=N     raw chunk body, appended at N -> {"offset"}
+    POST /uploads/<id>/complete     -> {"upload_id", "filename", "size", "sha256"}
+
+    Chunks are streamed straight to disk, so a worker never holds more than
+    one read block of the file in memory.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+    @server.route("/uploads", methods=["POST"])
+    def create_upload():
+        body = request.get_json(silent=True) or {}
+        filename = os.path.basename(str(body.get("filename") or ""))
+        size = body.get("size")
+        if not filename or not isinstance(size, int) or size <= 0:
+            return jsonify(error="filename and a positive size are required"), 400
+
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in VIDEO_EXTENSIONS:
+            return jsonify(error=f"Unsupported video type '{ext}'"), 415
+        if size > MAX_UPLOAD_BYTES:
+            return jsonify(error="File too large", max_bytes=MAX_UPLOAD_BYTES), 413
+
+        _purge_stale()
+        upload_id = uuid.uuid4().hex
+        open(_part_path(upload_id), "wb").close()
+        _save_meta(upload_id, {
+            "upload_id": upload_id,
+            "filename": filename,
+            "size": size,
+            "complete": False,
+            "created_at": time.time(),
+        })
+        return jsonify(upload_id=upload_id, chunk_size=CHUNK_BYTES), 201
+
+    @server.route("/uploads/<upload_id>", methods=["GET"])
+    def upload_status(upload_id):
+        meta = _load_meta(upload_id)
+        if meta is None:
+            return jsonify(error="Unknown upload"), 404
+        offset = meta["size"] if meta["complete"] else _received(upload_id)
+        return jsonify(offset=offset, size=meta["size"], complete=meta["complete"])
+
+    @server.route("/uploads/<upload_id>", methods=["PUT"])
+    def upload_chunk(upload_id):
+        meta = _load_meta(upload_id)
+        if meta is None:
+            return jsonify(error="Unknown upload"), 404
+        if meta["complete"]:
+            return jsonify(error="Upload already complete"), 409
+
+        offset = request.args.get("offset", type=int)
+        received = _received(upload_id)
+        if offset != received:
+            # Client is out of sync (e.g. resuming); tell it where to continue from
+            return jsonify(error="Offset mismatch", offset=received), 409
+
+        length = request.content_length
+        if length is None or length > MAX_CHUNK_BYTES or offset + length > meta["size"]:
+            return jsonify(error="Chunk too large", offset=received), 413
+
+        written = 0
+        with open(_part_path(upload_id), "r+b") as f:
+            f.seek(offset)
+            while written < length:
+                block = request.stream.read(min(_STREAM_BLOCK, length - written))
+                if not block:
+                    break
+                f.write(block)
+                written += len(block)
+            if written != length:
+                # Short body: drop the partial chunk so the client can resend it
+                f.truncate(offset)
+                return jsonify(error="Incomplete chunk", offset=offset), 400
+
+        return jsonify(offset=offset + written)
+
+    @server.route("/uploads/<upload_id>/complete", methods=["POST"])
+    def complete_upload(upload_id):
+        meta = _load_meta(upload_id)
+        if meta is None:
+            return jsonify(error="Unknown upload"), 404
+        if not meta["complete"]:
+            received = _received(upload_id)
+            if received != meta["size"]:
+                return jsonify(error="Upload incomplete", offset=received), 409
+            # Identical content uploaded earlier collapses onto the same stored object
+            meta["sha256"] = media_store.ingest_file(_part_path(upload_id))
+            meta["path"] = media_store.object_path(meta["sha256"])
+            meta["complete"] = True
+            _save_meta(upload_id, meta)
+        return jsonify(upload_id=upload_id, filename=meta["filename"], size=meta["size"],
+                       sha256=meta["sha256"])
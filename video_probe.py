@@ -0,0 +1,128 @@
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+
+from lazy_imports import lazy_module
+from media_store import media_store
+
+# Resolved on the first probe, not at app import
+imageio_ffmpeg = lazy_module("imageio_ffmpeg")
+
+PROBE_TIMEOUT_SECONDS = 30
+
+_DURATION = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+_BITRATE = re.compile(r"bitrate:\s*(\d+)\s*kb/s")
+_VIDEO_STREAM = re.compile(r"Stream #\S+.*?: Video: (\w+)(.*)")
+_AUDIO_STREAM = re.compile(r"Stream #\S+.*?: Audio: (\w+)(.*)")
+_RESOLUTION = re.compile(r"\b(\d{2,5})x(\d{2,5})\b")
+_FPS = re.compile(r"([\d.]+)(k?) (?:fps|tbr)")
+_SAMPLE_RATE = re.compile(r"(\d+) Hz")
+
+
+@dataclass
+class VideoInfo:
+    """Container-level facts about a video, read from its header."""
+    duration: float = 0.0
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    video_codec: str = ""
+    audio_codec: str = ""
+    has_audio: bool = False
+    audio_sample_rate: int = 0
+    bitrate_kbps: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def parse_ffmpeg_header(text):
+    """Parse the stream summary ffmpeg prints to stderr for `ffmpeg -i <file>`."""
+    if "Input #0" not in text:
+        lines = [line for line in text.strip().splitlines() if line.strip()]
+        raise ValueError(lines[-1] if lines else "ffmpeg could not read the file")
+
+    info = VideoInfo()
+
+    match = _DURATION.search(text)
+    if match:
+        hours, minutes, seconds = match.groups()
+        info.duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    match = _BITRATE.search(text)
+    if match:
+        info.bitrate_kbps = int(match.group(1))
+
+    match = _VIDEO_STREAM.search(text)
+    if match:
+        info.video_codec = match.group(1)
+        details = match.group(2)
+        resolution = _RESOLUTION.search(details)
+        if resolution:
+            info.width, info.height = int(resolution.group(1)), int(resolution.group(2))
+        fps = _FPS.search(details)
+        if fps:
+            info.fps = float(fps.group(1)) * (1000 if fps.group(2) else 1)
+
+    match = _AUDIO_STREAM.search(text)
+    if match:
+        info.has_audio = True
+        info.audio_codec = match.group(1)
+        sample_rate = _SAMPLE_RATE.search(match.group(2))
+        if sample_rate:
+            info.audio_sample_rate = int(sample_rate.group(1))
+
+    return info
+
+
+@lru_cache(maxsize=None)
+def ffmpeg_exe():
+    """Path of the ffmpeg binary bundled with imageio-ffmpeg (or FFMPEG_BINARY)."""
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def _run_probe(path):
+    # With no output file ffmpeg only opens the container, prints the header and exits
+    command = [ffmpeg_exe(), "-hide_banner", "-nostdin", "-i", path]
+    completed = subprocess.run(
+        command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=PROBE_TIMEOUT_SECONDS
+    )
+    return parse_ffmpeg_header(completed.stderr.decode("utf-8", errors="replace"))
+
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+_MEMORY_ENTRIES = 256
+
+
+def probe_video(path, content_hash=None):
+    """
+    Return a VideoInfo for `path` without decoding any frames.
+
+    When `content_hash` is given the result is memoised in memory and as the
+    'probe.json' artifact of that hash in the media store, so re-uploads of
+    the same file are answered instantly.
+    """
+    if content_hash is None:
+        return _run_probe(path)
+
+    with _memory_lock:
+        if content_hash in _memory:
+            _memory.move_to_end(content_hash)
+            return _memory[content_hash]
+
+    cached = media_store.get_json(content_hash, "probe.json")
+    if cached is not None:
+        info = VideoInfo(**cached)
+    else:
+        info = _run_probe(path)
+        media_store.put_json(content_hash, "probe.json", info.to_dict())
+
+    with _memory_lock:
+        _memory[content_hash] = info
+        while len(_memory) > _MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+    return info